@@ -0,0 +1,317 @@
+"""
+Seeded, offscreen stress benchmarks for game0, game1 and game2.
+
+Every scenario runs in its own process with the dummy SDL driver, one game tick
+per frame and no frame cap, and reports ticks per second, frame time
+percentiles, the peak number of stars/bombs/particles and peak memory:
+
+    python benchmark.py                               # everything, as a table
+    python benchmark.py --only game2 --frames 3000
+    python benchmark.py --save baseline.json          # keep the results
+    python benchmark.py --baseline baseline.json      # compare; exit code 1 if slower
+
+game0 and game1 are scripts, so they are run as they are (with --profile-out to
+collect the frame timings) while the harness feeds them input and pins game
+variables between frames. game2 is driven through its Game class.
+"""
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import argparse
+import json
+import random
+import runpy
+import subprocess
+import sys
+import tempfile
+
+try:
+    import resource  # not available on Windows
+except ImportError:
+    resource = None
+
+PROJECTS_DIR = os.path.dirname(os.path.abspath(__file__))
+WARMUP_FRAMES = 60
+SIM_WIDTH, SIM_HEIGHT = 1920, 1080
+
+
+# Scenario hooks run at the start of every frame. `game` is the script's
+# globals (game0/game1, the hook returns events to add) or the Game object
+# (game2), wrapped in a HookTarget.
+def pin_late_game(game, frame, rng):
+    game["score"] = 5000
+    game["game_over"] = False
+    return []
+
+
+def chain_explosions(game, frame, rng):
+    game["game_over"] = False
+    for _ in range(3):
+        game["create_explosion"]((rng.randrange(game["WIDTH"]), rng.randrange(game["HEIGHT"])))
+    return []
+
+
+def churn_powerups(game, frame, rng):
+    import pygame
+    game["game_over"] = False
+    game["shield_count"] = game["slow_time_count"] = 99
+    game["shield_active"] = game["slow_time_active"] = False  # so S and T fire every frame
+    return [pygame.event.Event(pygame.KEYDOWN, key=key, mod=0, unicode="", scancode=0)
+            for key in (pygame.K_s, pygame.K_t)]
+
+
+def game2_late_game(game, frame, rng):
+    game.score = 5000
+    game.game_over = False
+
+
+def game2_explosions(game, frame, rng):
+    game.game_over = False
+    for _ in range(3):
+        game.create_explosion((rng.randrange(game.width), rng.randrange(game.height)))
+
+
+def game2_powerups(game, frame, rng):
+    game.game_over = False
+    game.shield_count = game.slow_time_count = 99
+    game.player.shield_active = game.slow_time_active = False
+    game.activate_shield()
+    game.activate_slow_time()
+
+
+# Lets a hook set only variables the game already has, so a renamed or
+# moved variable fails the scenario instead of quietly setting a name
+# nothing reads (the scenario would still report numbers)
+class HookTarget:
+    def __init__(self, target, where):
+        object.__setattr__(self, "_target", target)
+        object.__setattr__(self, "_where", where)
+
+    def _check(self, exists, name):
+        if not exists:
+            raise AssertionError(f"{self._where}: the game has no variable {name!r} to set")
+
+    def __getitem__(self, name):
+        return self._target[name]
+
+    def __setitem__(self, name, value):
+        self._check(name in self._target, name)
+        self._target[name] = value
+
+    def __getattr__(self, name):
+        return getattr(self._target, name)
+
+    def __setattr__(self, name, value):
+        self._check(hasattr(self._target, name), name)
+        setattr(self._target, name, value)
+
+
+SCENARIOS = {
+    "game0": {
+        "single": {"args": [], "hook": None},
+        # 7 paddles and slow stars (levels/slow_stars.json), so the grid holds many stars at once
+        "teams": {"args": ["G10A Team 3", "G10A Team 1", "--level", "slow_stars"], "hook": None},
+    },
+    # At full quality, so the quality governor does not hide a slowdown
+    "game1": {
+        "late_game": {"args": ["--full-quality"], "hook": pin_late_game},
+        "explosions": {"args": ["--full-quality"], "hook": chain_explosions},
+        "powerups": {"args": ["--full-quality"], "hook": churn_powerups},
+    },
+    "game2": {
+        "late_game": {"hook": game2_late_game},
+        "explosions": {"hook": game2_explosions},
+        "powerups": {"hook": game2_powerups},
+    },
+}
+
+
+def peak_memory_kb():
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss  # kB on Linux
+
+
+# Ticks per second come from the recorded frame times, so start-up is not counted
+def summarize(game, scenario, records):
+    from common.profiler import percentiles
+    measured = records[WARMUP_FRAMES:] or records
+    frame_ms = [r.get("total_ms", 0.0) for r in measured]
+    counts = {}
+    for record in records:
+        for name in ("stars", "bombs", "particles"):
+            if name in record:
+                counts[name] = max(counts.get(name, 0), record[name])
+    return {
+        "game": game,
+        "scenario": scenario,
+        "frames": len(records),
+        "ticks_per_s": round(len(measured) * 1000 / max(sum(frame_ms), 1e-9), 1),
+        "frame_ms": {f"p{p}": round(value, 3) for p, value in zip((50, 95, 99), percentiles(frame_ms))},
+        "peak": counts,
+        "max_rss_kb": peak_memory_kb(),
+    }
+
+
+# Runs game0/game1's game.py with a fast clock, one tick per frame and scripted input
+def run_script(game, scenario, frames, seed):
+    import numpy as np
+    import pygame
+    sys.path.insert(0, PROJECTS_DIR)
+    from common.loop import FixedTimestep
+
+    spec = SCENARIOS[game][scenario]
+    rng = random.Random(seed)
+    script = os.path.join(PROJECTS_DIR, game, "game.py")
+    records_path = os.path.join(tempfile.mkdtemp(), "frames.json")
+
+    class FastClock:
+        def tick(self, framerate=0):
+            return 0
+
+    pygame.time.Clock = FastClock
+    FixedTimestep.advance = lambda self: 1
+    get_events = pygame.event.get
+    frame = 0
+    script_globals = {}
+
+    def scripted_events(*args, **kwargs):
+        nonlocal frame, script_globals
+        frame += 1
+        script_globals = sys._getframe(1).f_globals  # the game script's variables
+        events = get_events(*args, **kwargs)
+        if frame == 1:
+            if "particles" in script_globals:
+                script_globals["particles"].rng = np.random.default_rng(seed)
+            events.append(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_SPACE, mod=0, unicode=" ", scancode=0))
+        elif spec["hook"]:
+            events += spec["hook"](HookTarget(script_globals, f"{game}/{scenario}"), frame, rng)
+        if frame > frames:
+            events.append(pygame.event.Event(pygame.QUIT))
+        return events
+
+    def sweeping_mouse():
+        width = script_globals.get("WIDTH", SIM_WIDTH)
+        return (int(width / 2 + width / 2.5 * np.sin(frame / 40)), script_globals.get("HEIGHT", SIM_HEIGHT) - 150)
+
+    pygame.event.get = scripted_events
+    pygame.mouse.get_pos = sweeping_mouse
+
+    random.seed(seed)
+    sys.argv = [script] + spec["args"] + ["--profile-out", records_path]
+    os.chdir(tempfile.mkdtemp())  # any highscore/scores files go here, not into the repo
+    try:
+        runpy.run_path(script, run_name="__main__")
+    except SystemExit:
+        pass
+    with open(records_path, "r", encoding="utf-8") as f:
+        records = json.load(f)
+    return summarize(game, scenario, records)
+
+
+def run_game2(scenario, frames, seed):
+    import pygame
+    sys.path.insert(0, os.path.join(PROJECTS_DIR, "game2"))
+    sys.path.insert(0, PROJECTS_DIR)
+    from common.profiler import FrameProfiler
+    from common.render import Renderer
+    from game import Game, COLOR_BG
+    from headless import PolicyInput, chase_policy
+
+    hook = SCENARIOS["game2"][scenario]["hook"]
+    rng = random.Random(seed)
+    random.seed(seed)
+    screen = pygame.display.set_mode((SIM_WIDTH, SIM_HEIGHT))
+    profiler = FrameProfiler(keep_records=True)
+    source = PolicyInput(chase_policy)
+    game = Game(SIM_WIDTH, SIM_HEIGHT, input_source=source, profiler=profiler)
+    source.game = game
+    renderer = Renderer(COLOR_BG)
+    target = HookTarget(game, f"game2/{scenario}")
+
+    profiler.skip_frame()
+    for frame in range(frames):
+        hook(target, frame, rng)
+        profiler.mark("events")
+        game.update()
+        game.draw(screen, 1.0, renderer)
+        renderer.present()
+        profiler.mark("flip")
+        profiler.end_frame(stars=len(game.stars), bombs=len(game.bombs), particles=len(game.particles))
+    return summarize("game2", scenario, profiler.records)
+
+
+def run_child(game, scenario, frames, seed):
+    command = [sys.executable, os.path.abspath(__file__), "--child", game, scenario,
+               "--frames", str(frames), "--seed", str(seed)]
+    output = subprocess.run(command, capture_output=True, text=True, cwd=PROJECTS_DIR)
+    if output.returncode != 0:
+        raise RuntimeError(f"{game}/{scenario} failed:\n{output.stderr}")
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+# Percentage change against the baseline: positive means faster
+def compare(results, baseline, tolerance):
+    old = {(r["game"], r["scenario"]): r for r in baseline}
+    slower = []
+    for result in results:
+        before = old.get((result["game"], result["scenario"]))
+        if before is None:
+            continue
+        change = (result["ticks_per_s"] / before["ticks_per_s"] - 1) * 100
+        print(f"{result['game']}/{result['scenario']:<12} {before['ticks_per_s']:>9.1f} -> "
+              f"{result['ticks_per_s']:>9.1f} ticks/s ({change:+.1f}%)")
+        if change < -tolerance:
+            slower.append(f"{result['game']}/{result['scenario']}")
+    return slower
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offscreen stress benchmarks for the three games")
+    parser.add_argument("--frames", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--only", choices=sorted(SCENARIOS), help="run one game only")
+    parser.add_argument("--save", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="compare against results saved with --save")
+    parser.add_argument("--tolerance", type=float, default=10.0, help="allowed slowdown in percent")
+    parser.add_argument("--child", nargs=2, metavar=("GAME", "SCENARIO"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        game, scenario = args.child
+        if game == "game2":
+            result = run_game2(scenario, args.frames, args.seed)
+        else:
+            result = run_script(game, scenario, args.frames, args.seed)
+        print(json.dumps(result))
+        return
+
+    results = []
+    for game in sorted(SCENARIOS):
+        if args.only and game != args.only:
+            continue
+        for scenario in SCENARIOS[game]:
+            result = run_child(game, scenario, args.frames, args.seed)
+            results.append(result)
+            ms = result["frame_ms"]
+            peak = " ".join(f"{name}={count}" for name, count in result["peak"].items())
+            print(f"{game}/{scenario:<12} {result['ticks_per_s']:>9.1f} ticks/s  "
+                  f"p50 {ms['p50']:.2f}  p95 {ms['p95']:.2f}  p99 {ms['p99']:.2f} ms  "
+                  f"{peak}  rss {result['max_rss_kb']} kB")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            slower = compare(results, json.load(f), args.tolerance)
+        if slower:
+            print(f"Slower than the baseline: {', '.join(slower)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+"""Shared building blocks used by the games in Projects/ (game0, game1, game2)."""
@@ -0,0 +1,173 @@
+"""
+Sound effects on a small, fixed pool of mixer channels.
+
+Every effect is decoded (or synthesised) into memory once when Audio is
+created, so play() only hands a ready buffer to a channel and returns; SDL mixes
+it on its own audio thread. The mixer runs with a small buffer (256 samples,
+about 6 ms at 44.1 kHz) so a sound starts close to the frame that caused it:
+
+    audio = Audio()                 # Audio(enabled=False) plays nothing
+    audio.play("catch")
+    audio.play_music()              # sounds/music.ogg, streamed from disk
+    print(audio.summary())          # Audio: 256-sample buffer at 44100 Hz (5.8 ms), play() p99 0.02 ms ...
+
+Effects have a priority and a voice limit. When twenty bombs go off in one
+frame, an effect that already has its limit of voices playing restarts its
+oldest one, and when every channel is busy a new sound takes the channel of
+the lowest-priority, oldest sound, or is dropped if everything playing matters
+more. A file named after an effect in common/sounds (catch.wav, explosion.ogg,
+...) replaces the built-in synthesised sound.
+"""
+import os
+import time
+from collections import deque
+
+import numpy as np
+import pygame
+
+from .profiler import percentiles
+
+perf_counter = time.perf_counter
+
+SOUNDS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sounds")
+MUSIC_FILES = ("music.ogg", "music.mp3", "music.wav")
+
+# name: (priority, most voices at once, synthesiser settings)
+EFFECTS = {
+    "catch": (1, 3, {"tone": (880, 1320), "ms": 90}),
+    "explosion": (2, 4, {"noise": True, "ms": 400}),
+    "shield": (3, 1, {"tone": (300, 900), "ms": 250, "square": True}),
+    "slow_time": (3, 1, {"tone": (800, 200), "ms": 500}),
+    "game_over": (4, 1, {"tone": (330, 110), "ms": 700, "square": True}),
+}
+
+
+# A mono effect as floats in -1..1: a tone sweeping between two pitches, or filtered noise
+def synthesise(frequency, tone=None, ms=100, noise=False, square=False):
+    n = int(frequency * ms / 1000)
+    t = np.arange(n) / frequency
+    if noise:
+        rng = np.random.default_rng(0)
+        wave = rng.uniform(-1, 1, n)
+        # Running average as a cheap low-pass filter, for a rumble instead of a hiss
+        kernel = np.ones(24) / 24
+        wave = np.convolve(wave, kernel, mode="same") * 4
+    else:
+        pitch = np.linspace(tone[0], tone[1], n)
+        wave = np.sin(2 * np.pi * np.cumsum(pitch) / frequency)
+        if square:
+            wave = np.sign(wave) * 0.5
+    envelope = np.exp(-4 * t / t[-1]) * np.minimum(1, np.arange(n) / (frequency * 0.003))  # 3 ms attack, no click
+    return np.clip(wave * envelope, -1, 1)
+
+
+class Audio:
+    def __init__(self, enabled=True, frequency=44100, buffer=256, channels=16, sounds_dir=SOUNDS_DIR, volume=0.7):
+        self.enabled = False
+        self.sounds_dir = sounds_dir
+        self.buffer = buffer
+        self.frequency = frequency
+        self.sounds = {}  # name -> (Sound, priority, voices)
+        self.channels = []
+        self.playing = []  # per channel: (priority, started, name)
+        self.play_ms = deque(maxlen=600)  # how long play() calls took
+        self.stolen = 0
+        self.dropped = 0
+        if enabled:
+            self._open(frequency, buffer, channels, volume)
+
+    def _open(self, frequency, buffer, channels, volume):
+        try:
+            # 16-bit samples are required, so the synthesised effects match the mixer
+            pygame.mixer.init(frequency, -16, 2, buffer, allowedchanges=pygame.AUDIO_ALLOW_FREQUENCY_CHANGE
+                              | pygame.AUDIO_ALLOW_CHANNELS_CHANGE)
+        except pygame.error as e:
+            print(f"No sound: {e}")
+            return
+        self.frequency, _, mixer_channels = pygame.mixer.get_init()
+        pygame.mixer.set_num_channels(channels)
+        self.channels = [pygame.mixer.Channel(i) for i in range(channels)]
+        self.playing = [(0, 0.0, None)] * channels
+        for name, (priority, voices, settings) in EFFECTS.items():
+            sound = self._load_file(name)
+            if sound is None:
+                wave = (synthesise(self.frequency, **settings) * 32767).astype(np.int16)
+                if mixer_channels > 1:
+                    wave = np.repeat(wave[:, None], mixer_channels, axis=1)
+                sound = pygame.sndarray.make_sound(np.ascontiguousarray(wave))
+            sound.set_volume(volume)
+            self.sounds[name] = (sound, priority, voices)
+        self.enabled = True
+
+    def _load_file(self, name):
+        for ext in (".wav", ".ogg"):
+            path = os.path.join(self.sounds_dir, name + ext)
+            if os.path.isfile(path):
+                return pygame.mixer.Sound(path)  # decoded into memory now, not when played
+        return None
+
+    # Starts the effect on a free channel, or on one taken from a less important sound
+    def play(self, name):
+        if not self.enabled:
+            return
+        start = perf_counter()
+        sound, priority, voices = self.sounds[name]
+        playing = self.playing
+        free = same = None
+        same_count = 0
+        for i, channel in enumerate(self.channels):
+            if not channel.get_busy():
+                if free is None:
+                    free = i
+            elif playing[i][2] == name:
+                same_count += 1
+                if same is None or playing[i][1] < playing[same][1]:
+                    same = i
+        if same_count >= voices:
+            slot = same  # restart the oldest voice of this effect
+            self.stolen += 1
+        elif free is not None:
+            slot = free
+        else:
+            slot = min(range(len(playing)), key=lambda i: playing[i][:2])  # lowest priority, then oldest
+            if playing[slot][0] > priority:
+                self.dropped += 1
+                return
+            self.stolen += 1
+        self.channels[slot].play(sound)
+        playing[slot] = (priority, start, name)
+        self.play_ms.append((perf_counter() - start) * 1000)
+
+    # Plays a music file on a loop, streamed from disk (the first of MUSIC_FILES by default)
+    def play_music(self, path=None, volume=0.4):
+        if not self.enabled:
+            return False
+        if path is None:
+            paths = [os.path.join(self.sounds_dir, name) for name in MUSIC_FILES]
+            path = next((p for p in paths if os.path.isfile(p)), None)
+            if path is None:
+                return False
+        try:
+            pygame.mixer.music.load(path)
+        except pygame.error as e:
+            print(f"Could not play {path}: {e}")
+            return False
+        pygame.mixer.music.set_volume(volume)
+        pygame.mixer.music.play(-1)
+        return True
+
+    def stop(self):
+        if self.enabled:
+            pygame.mixer.music.stop()
+            pygame.mixer.stop()
+
+    # Time a sound waits in the mixer buffer before it is heard, in ms
+    def buffer_ms(self):
+        return self.buffer / self.frequency * 1000
+
+    def summary(self):
+        if not self.enabled:
+            return "Audio: off"
+        p99, = percentiles(self.play_ms, (99,))
+        return (f"Audio: {self.buffer}-sample buffer at {self.frequency} Hz ({self.buffer_ms():.1f} ms), "
+                f"play() p99 {p99:.2f} ms, {self.stolen} stolen, {self.dropped} dropped")
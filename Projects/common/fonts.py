@@ -0,0 +1,71 @@
+"""
+Fonts without the slow system font scan on every launch.
+
+pygame.font.SysFont() looks through every installed font to find the file for a
+name like "Arial", which takes a noticeable part of a cold start. get_font()
+does that lookup once, remembers the file path on disk for the next launches,
+and keeps every Font object it created, so calling it each frame is cheap:
+
+    title = get_font("Arial", 64, bold=True)
+"""
+import json
+import os
+
+import pygame
+
+CACHE_DIR = os.path.join(os.environ.get("LOCALAPPDATA") or os.environ.get("XDG_CACHE_HOME")
+                         or os.path.join(os.path.expanduser("~"), ".cache"), "imssg")
+CACHE_FILE = os.path.join(CACHE_DIR, "fonts.json")
+
+_fonts = {}   # (name, size, bold) -> Font
+_paths = None  # "name|bold" -> [font file or None, fake bold]
+
+
+def _load_paths():
+    try:
+        with open(CACHE_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_paths():
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        temp_path = CACHE_FILE + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(_paths, f)
+        os.replace(temp_path, CACHE_FILE)
+    except OSError:
+        pass  # no cache this time, the next launch scans again
+
+
+# Font file for a system font name, like SysFont picks it (None = pygame's default font)
+def _resolve(name, bold):
+    global _paths
+    if _paths is None:
+        _paths = _load_paths()
+    key = f"{name.lower()}|{int(bold)}"
+    entry = _paths.get(key)
+    if entry is not None and (entry[0] is None or os.path.exists(entry[0])):
+        return entry
+    path = pygame.font.match_font(name, bold=bold)
+    # No bold file for this font: SysFont draws the regular one in fake bold
+    fake_bold = bool(bold and path is not None and path == pygame.font.match_font(name))
+    _paths[key] = entry = [path, fake_bold]
+    _save_paths()
+    return entry
+
+
+def get_font(name, size, bold=False):
+    key = (name, size, bold)
+    font = _fonts.get(key)
+    if font is None:
+        if not pygame.font.get_init():
+            pygame.font.init()
+        path, fake_bold = _resolve(name, bold)
+        font = pygame.font.Font(path, size)
+        if fake_bold or (bold and path is None):
+            font.set_bold(True)
+        _fonts[key] = font
+    return font
@@ -0,0 +1,65 @@
+"""
+Cached HUD text and full-screen overlays.
+
+font.render() rasterises the text again on every call, even when the score has
+not changed. Hud remembers the last text of every named widget and only renders
+it again when the value changes; the rendered surfaces are also kept in a small
+LRU cache, so banners that come and go ("SHIELD ACTIVE!") are not re-rendered.
+
+    hud = Hud()
+    screen.blit(hud.text("score", font, f"Score: {score}", WHITE), (20, 20))
+    screen.blit(get_overlay(screen.get_size()), (0, 0))
+"""
+from collections import OrderedDict
+
+import pygame
+
+
+class TextCache:
+    def __init__(self, capacity=256):
+        self.capacity = capacity
+        self.surfaces = OrderedDict()
+
+    def render(self, font, text, color):
+        key = (font, text, color)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            return surface
+        surface = font.render(text, True, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.capacity:
+            self.surfaces.popitem(last=False)  # least recently used
+        return surface
+
+    def clear(self):
+        self.surfaces.clear()
+
+
+class Hud:
+    def __init__(self, cache=None):
+        self.cache = cache or TextCache()
+        self.widgets = {}  # name -> (font, text, color, surface)
+
+    # Returns the surface for widget `name`, rendering only if font/text/colour changed
+    def text(self, name, font, text, color):
+        widget = self.widgets.get(name)
+        if widget is not None and widget[0] is font and widget[1] == text and widget[2] == color:
+            return widget[3]
+        surface = self.cache.render(font, text, color)
+        self.widgets[name] = (font, text, color, surface)
+        return surface
+
+
+_overlays = {}
+
+
+# Translucent full-screen surface, built once per (size, colour)
+def get_overlay(size, color=(0, 0, 0, 180)):
+    key = (tuple(size), tuple(color))
+    overlay = _overlays.get(key)
+    if overlay is None:
+        overlay = pygame.Surface(key[0], pygame.SRCALPHA)
+        overlay.fill(color)
+        _overlays[key] = overlay
+    return overlay
@@ -0,0 +1,61 @@
+"""
+Low-latency input helpers and an input-to-display latency probe.
+
+The probe measures how old the input shown on screen is: sample() is called
+when the input that the next frame draws is read, presented() right after the
+display flip. Drawing the player at its interpolated tick position can show
+input that is a tick or more old; low-latency mode reads the input again just
+before drawing instead:
+
+    allow_events(pygame.QUIT, pygame.KEYDOWN)   # the queue only keeps these
+    probe = LatencyProbe()
+    ...
+    pos = pygame.mouse.get_pos();  probe.sample()
+    draw(pos);  pygame.display.flip();  probe.presented()
+    print(probe.summary())   # Input to flip: p50 1.8  p95 2.6  p99 4.1 ms (600 frames)
+
+The time from flip to light on the screen depends on the monitor and is not
+included.
+"""
+import time
+from collections import deque
+
+import pygame
+
+from .profiler import percentiles
+
+perf_counter = time.perf_counter
+
+
+# Blocks every event type except the given ones, so the queue does not fill up
+# with mouse motion and window events the game never looks at
+def allow_events(*types):
+    pygame.event.set_blocked(None)
+    pygame.event.set_allowed(list(types))
+
+
+class LatencyProbe:
+    def __init__(self, history=600):
+        self.samples = deque(maxlen=history)
+        self.sampled_at = None
+        self.last_ms = 0.0
+
+    # Call when reading the input the next frame will show
+    def sample(self):
+        self.sampled_at = perf_counter()
+
+    # Call right after the flip; returns the latency of this frame in ms
+    def presented(self):
+        if self.sampled_at is None:
+            return None
+        self.last_ms = (perf_counter() - self.sampled_at) * 1000
+        self.samples.append(self.last_ms)
+        return self.last_ms
+
+    def percentiles(self, points=(50, 95, 99)):
+        return dict(zip(points, percentiles(self.samples, points)))
+
+    def summary(self):
+        p = self.percentiles()
+        return (f"Input to flip: p50 {p[50]:.1f}  p95 {p[95]:.1f}  p99 {p[99]:.1f} ms "
+                f"({len(self.samples)} frames)")
@@ -0,0 +1,251 @@
+"""
+Difficulty from level files, compiled into spawn tables.
+
+A level is a JSON file in Projects/levels (or anywhere, by path) that says how
+often stars and bombs spawn, how fast they fall and how both ramp up with the
+score, plus optional waves that change the spawn rates for a stretch of time:
+
+    {
+      "name": "Bomb Edition",
+      "score_band": 10,
+      "star": {"chance": [0.03, 2000, 0.07], "speed": [3, 100, 12], "speed_spread": 2},
+      "bomb": {"chance": [0.005, 4000, 0.02], "speed": [4, 80, 16], "speed_spread": 2},
+      "power_up": 0.1,
+      "waves": [{"from": 60, "to": 75, "star": 2.0, "bomb": 0.0}]
+    }
+
+A value is a number or a ramp [start, points, cap], which is
+start + min(score / points, cap). "speed" is the slowest speed of a new object
+and the fastest is speed + speed_spread, or its own ramp "speed_high". Chances
+stay between 0 and 1 and speeds above 0 over the whole ramp. Waves
+give from/to in seconds of game time and multiply the star and bomb chances.
+
+load_level() works every value out for each score band (score_band points
+wide, up to where every ramp has hit its cap) and each second covered by a wave,
+so a game tick only looks up a row:
+
+    level = load_level("game2")
+    star_chance, star_low, star_high, bomb_chance, bomb_low, bomb_high, power_up = level.at(score, tick)
+
+Loading the same level again in one process returns the same Level. The
+compiled tables are cached next to the font cache in a small binary file,
+keyed by a hash of the level file, so later launches skip parsing and compiling.
+"""
+import hashlib
+import json
+import math
+import os
+import struct
+
+from .fonts import CACHE_DIR
+
+LEVELS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "levels")
+TICKS_PER_SECOND = 60  # every game runs its logic at 60 ticks per second
+
+MAGIC = b"LVL1"
+COMPILER_VERSION = 3  # part of the cache key: bump it whenever compile_level() changes its output or checks
+HEADER = struct.Struct("<4sIII")  # magic, score band, band rows, wave seconds
+ROW = struct.Struct("<7d")  # star chance, star low, star high, bomb chance, bomb low, bomb high, power-up chance
+WAVE = struct.Struct("<2d")  # star and bomb chance multipliers; NaN = no wave this second
+MAX_BANDS = 100_000
+
+_levels = {}  # path -> Level, loaded in this process
+
+
+class LevelError(ValueError):
+    pass
+
+
+class Level:
+    def __init__(self, name, score_band, rows, waves):
+        self.name = name
+        self.score_band = score_band
+        self.rows = rows  # one tuple (see ROW) per score band
+        self.waves = waves  # one (star, bomb) multiplier pair or None per second
+        self.last_band = len(rows) - 1
+        self.wave_ticks = len(waves) * TICKS_PER_SECOND
+
+    # Spawn values for this score and game tick, see ROW
+    def at(self, score, tick=0):
+        band = score // self.score_band
+        row = self.rows[band if band < self.last_band else self.last_band]
+        if tick < self.wave_ticks:
+            wave = self.waves[tick // TICKS_PER_SECOND]
+            if wave is not None:
+                return (row[0] * wave[0],) + row[1:3] + (row[3] * wave[1],) + row[4:]
+        return row
+
+
+def _ramp(value, score):
+    if isinstance(value, (int, float)):
+        return value
+    start, points, cap = value
+    return start + min(score / points, cap)
+
+
+# Score from which the ramp stays at its cap
+def _ramp_end(value):
+    if isinstance(value, (int, float)):
+        return 0
+    start, points, cap = value
+    return cap * points
+
+
+# What a value may be: a test for every value the level can produce, and how to say it
+CHANCE = (lambda v: 0 <= v <= 1, "between 0 and 1")
+SPEED = (lambda v: v > 0, "above 0")
+SPREAD = (lambda v: v >= 0, "at least 0")
+
+
+def _finite(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+
+# A number or a ramp whose values all pass `valid`. A ramp moves from start to
+# start + cap, so those two ends are the values that are checked
+def _check_value(value, where, valid):
+    if not (_finite(value) or (isinstance(value, list) and len(value) == 3
+                               and all(_finite(v) for v in value) and value[1] > 0)):
+        raise LevelError(f"{where}: expected a number or [start, points, cap], got {value!r}")
+    check, expected = valid
+    ends = (value,) if _finite(value) else (value[0], value[0] + value[2])
+    if not all(check(end) for end in ends):
+        raise LevelError(f"{where}: every value must be {expected}, got {value!r}")
+    return value
+
+
+def _check_number(value, where):
+    if not _finite(value):
+        raise LevelError(f"{where}: expected a number, got {value!r}")
+    return value
+
+
+def _object(data, kind):
+    spec = data.get(kind, {})
+    if not isinstance(spec, dict):
+        raise LevelError(f"{kind}: expected an object")
+    chance = _check_value(spec.get("chance", 0), f"{kind}.chance", CHANCE)
+    low = _check_value(spec.get("speed", 5), f"{kind}.speed", SPEED)
+    if "speed_high" in spec:
+        high = _check_value(spec["speed_high"], f"{kind}.speed_high", SPEED)
+        spread = None
+    else:
+        high = None
+        spread = _check_value(spec.get("speed_spread", 0), f"{kind}.speed_spread", SPREAD)
+        if not isinstance(spread, (int, float)):
+            raise LevelError(f"{kind}.speed_spread: expected a number")
+    return chance, low, high, spread
+
+
+def compile_level(data):
+    if not isinstance(data, dict):
+        raise LevelError("a level is a JSON object")
+    name = str(data.get("name", "Unnamed level"))
+    score_band = data.get("score_band", 10)
+    if not isinstance(score_band, int) or score_band < 1:
+        raise LevelError("score_band: expected a whole number of points, at least 1")
+    star = _object(data, "star")
+    bomb = _object(data, "bomb")
+    power_up = _check_value(data.get("power_up", 0.1), "power_up", CHANCE)
+
+    ramps = [value for spec in (star, bomb) for value in spec if value is not None] + [power_up]
+    # One band past the last cap, so everything from the last row on is capped
+    bands = math.ceil(max(_ramp_end(value) for value in ramps) / score_band) + 2
+    if bands > MAX_BANDS:
+        raise LevelError(f"the ramps take {bands} score bands to reach their caps (at most {MAX_BANDS})")
+    rows = []
+    for band in range(bands):
+        score = band * score_band
+        row = []
+        for chance, low, high, spread in (star, bomb):
+            # Same arithmetic as the games used before levels, so seeded games play out the same
+            speed_low = _ramp(low, score)
+            speed_high = _ramp(high, score) if high is not None else speed_low + spread
+            row += [_ramp(chance, score), speed_low, speed_high]
+        row.append(_ramp(power_up, score))
+        rows.append(tuple(float(v) for v in row))
+
+    waves = []
+    wave_specs = data.get("waves", [])
+    if not isinstance(wave_specs, list):
+        raise LevelError("waves: expected a list")
+    for i, wave in enumerate(wave_specs):
+        if not isinstance(wave, dict) or "from" not in wave or "to" not in wave:
+            raise LevelError(f"waves[{i}]: expected from, to (seconds) and star / bomb multipliers")
+        start = _check_number(wave["from"], f"waves[{i}].from")
+        end = _check_number(wave["to"], f"waves[{i}].to")
+        scale = tuple(float(_check_number(wave.get(kind, 1.0), f"waves[{i}].{kind}")) for kind in ("star", "bomb"))
+        if not 0 <= start < end:
+            raise LevelError(f"waves[{i}]: from must be at least 0 and before to")
+        first, last = int(start), math.ceil(end)
+        waves += [None] * (last - len(waves))
+        for second in range(first, last):
+            waves[second] = scale
+    return Level(name, score_band, rows, waves)
+
+
+def _pack(level):
+    name = level.name.encode("utf-8")
+    parts = [HEADER.pack(MAGIC, level.score_band, len(level.rows), len(level.waves))]
+    parts += [ROW.pack(*row) for row in level.rows]
+    parts += [WAVE.pack(*(wave or (math.nan, math.nan))) for wave in level.waves]
+    return b"".join(parts) + name
+
+
+def _unpack(data):
+    magic, score_band, bands, seconds = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("not a compiled level")
+    offset = HEADER.size
+    rows = list(ROW.iter_unpack(data[offset:offset + bands * ROW.size]))
+    offset += bands * ROW.size
+    waves = [None if math.isnan(wave[0]) else wave
+             for wave in WAVE.iter_unpack(data[offset:offset + seconds * WAVE.size])]
+    offset += seconds * WAVE.size
+    return Level(data[offset:].decode("utf-8"), score_band, rows, waves)
+
+
+# Path of a level: a file path, or the name of a file in LEVELS_DIR ("game2")
+def level_path(name):
+    if os.path.isfile(name):
+        return name
+    path = os.path.join(LEVELS_DIR, name + ".json")
+    if not os.path.isfile(path):
+        raise LevelError(f"no level file {name!r} (looked in {os.path.normpath(LEVELS_DIR)})")
+    return path
+
+
+def load_level(name):
+    path = level_path(name)
+    level = _levels.get(path)
+    if level is None:
+        level = _levels[path] = _load(path)
+    return level
+
+
+def _load(path):
+    with open(path, "rb") as f:
+        source = f.read()
+    # Keyed by the compiler too, so a changed compile_level() does not load stale tables
+    digest = hashlib.sha1(MAGIC + COMPILER_VERSION.to_bytes(4, "little") + source).hexdigest()[:16]
+    stem = os.path.splitext(os.path.basename(path))[0]
+    cache_path = os.path.join(CACHE_DIR, "levels", f"{stem}-{digest}.bin")
+    try:
+        with open(cache_path, "rb") as f:
+            return _unpack(f.read())
+    except (OSError, ValueError, struct.error, UnicodeDecodeError):
+        pass
+    try:
+        data = json.loads(source)
+    except ValueError as e:
+        raise LevelError(f"{path}: {e}")
+    level = compile_level(data)
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        temp_path = cache_path + ".tmp"
+        with open(temp_path, "wb") as f:
+            f.write(_pack(level))
+        os.replace(temp_path, cache_path)
+    except OSError:
+        pass  # no cache this time, the next launch compiles again
+    return level
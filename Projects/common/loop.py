@@ -0,0 +1,49 @@
+"""
+Fixed-timestep game loop helpers.
+
+The simulation always advances in steps of 1 / tick_rate seconds, no matter how
+fast or slow frames are drawn. Each frame asks how many steps are due, runs
+them, then draws with `alpha` (0..1) - how far we are between the last step and
+the next one - so positions can be interpolated smoothly:
+
+    timestep = FixedTimestep(60)
+    while running:
+        for _ in range(timestep.advance()):
+            update()
+        draw(timestep.alpha)
+"""
+import time
+
+
+def lerp(a, b, t):
+    # Linear interpolation: t = 0 gives a, t = 1 gives b
+    return a + (b - a) * t
+
+
+class FixedTimestep:
+    def __init__(self, tick_rate=60, max_steps_per_frame=5):
+        self.tick_rate = tick_rate
+        self.dt = 1.0 / tick_rate
+        # After a very long frame (window dragged, machine stalled) we drop the
+        # extra time instead of running hundreds of catch-up steps at once
+        self.max_frame_time = self.dt * max_steps_per_frame
+        self.accumulator = 0.0
+        self.last_time = time.perf_counter()
+
+    def reset(self):
+        # Call after a pause/menu so the waiting time is not simulated
+        self.accumulator = 0.0
+        self.last_time = time.perf_counter()
+
+    def advance(self):
+        now = time.perf_counter()
+        frame_time = min(now - self.last_time, self.max_frame_time)
+        self.last_time = now
+        self.accumulator += frame_time
+        steps = int(self.accumulator / self.dt)
+        self.accumulator -= steps * self.dt
+        return steps
+
+    @property
+    def alpha(self):
+        return min(self.accumulator / self.dt, 1.0)
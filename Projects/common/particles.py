@@ -0,0 +1,126 @@
+"""
+Particle system that keeps every particle in NumPy arrays (structure of arrays).
+
+Instead of one dict or object per particle, positions, velocities, life and
+radius live in contiguous arrays and are updated for all particles at once.
+Dead particles are removed in one bulk step, and the system never holds more
+than `capacity` particles. Particles are drawn as cached circle sprites (one per
+colour and whole-pixel radius) with a single blits() call.
+
+Install numpy if needed: python -m pip install numpy
+"""
+import struct
+
+import numpy as np
+
+from .sprites import get_circle
+
+# Header of get_state(): live count, PCG64 state and increment (128 bits each), buffered 32-bit draw
+STATE = struct.Struct("<I16s16sBI")
+
+
+class ParticleSystem:
+    # gravity is added to the y velocity every tick, shrink is taken off the
+    # radius every tick (particles die when life or radius reaches 0)
+    def __init__(self, capacity, colors, gravity=0.0, shrink=0.0, seed=None):
+        self.capacity = capacity
+        self.colors = list(colors)
+        self.gravity = gravity
+        self.shrink = shrink
+        self.rng = np.random.default_rng(seed)
+        self.pos = np.zeros((capacity, 2), dtype=np.float32)
+        self.vel = np.zeros((capacity, 2), dtype=np.float32)
+        self.life = np.zeros(capacity, dtype=np.int32)
+        self.radius = np.zeros(capacity, dtype=np.float32)
+        self.color = np.zeros(capacity, dtype=np.uint8)  # index into self.colors
+        self.count = 0
+        self.sprites = {}  # (colour index, radius) -> circle sprite
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        self.count = 0
+
+    # The live particles and the random generator as bytes, for game snapshots
+    def get_state(self):
+        n = self.count
+        rng = self.rng.bit_generator.state
+        header = STATE.pack(n, rng["state"]["state"].to_bytes(16, "little"),
+                            rng["state"]["inc"].to_bytes(16, "little"), rng["has_uint32"], rng["uinteger"])
+        return header + b"".join(array[:n].tobytes() for array in self._arrays())
+
+    def set_state(self, data):
+        n, state, inc, has_uint32, uinteger = STATE.unpack_from(data)
+        self.rng.bit_generator.state = {
+            "bit_generator": "PCG64",
+            "state": {"state": int.from_bytes(state, "little"), "inc": int.from_bytes(inc, "little")},
+            "has_uint32": has_uint32,
+            "uinteger": uinteger,
+        }
+        offset = STATE.size
+        for array in self._arrays():
+            size = array[:n].nbytes
+            array[:n] = np.frombuffer(data, array.dtype, size // array.itemsize, offset).reshape(array[:n].shape)
+            offset += size
+        self.count = n
+
+    def _arrays(self):
+        return self.pos, self.vel, self.life, self.radius, self.color
+
+    # vel_x / vel_y are (low, high) float ranges, radius / life are inclusive
+    # (low, high) integer ranges - the same as random.uniform / random.randint
+    def emit(self, pos, amount, vel_x, vel_y, radius, life):
+        amount = min(amount, self.capacity - self.count)
+        if amount <= 0:
+            return
+        start, end = self.count, self.count + amount
+        rng = self.rng
+        self.pos[start:end] = pos
+        self.vel[start:end, 0] = rng.uniform(vel_x[0], vel_x[1], amount)
+        self.vel[start:end, 1] = rng.uniform(vel_y[0], vel_y[1], amount)
+        self.radius[start:end] = rng.integers(radius[0], radius[1] + 1, amount)
+        self.life[start:end] = rng.integers(life[0], life[1] + 1, amount)
+        self.color[start:end] = rng.integers(0, len(self.colors), amount)
+        self.count = end
+
+    def update(self):
+        n = self.count
+        if n == 0:
+            return
+        vel = self.vel[:n]
+        if self.gravity:
+            vel[:, 1] += self.gravity
+        self.pos[:n] += vel
+        self.life[:n] -= 1
+        if self.shrink:
+            np.maximum(self.radius[:n] - self.shrink, 0, out=self.radius[:n])
+
+        alive = (self.life[:n] > 0) & (self.radius[:n] > 0)
+        alive_count = int(np.count_nonzero(alive))
+        if alive_count < n:
+            # Compact the survivors to the front of the arrays, keeping order
+            for array in self._arrays():
+                array[:alive_count] = array[:n][alive]
+            self.count = alive_count
+
+    # alpha: fraction of a tick since the last update, for interpolation.
+    # Returns the rects that were drawn (for dirty-rect rendering)
+    def draw(self, surf, alpha=1.0):
+        n = self.count
+        if n == 0:
+            return []
+        radii = self.radius[:n].astype(np.int32)
+        visible = radii > 0
+        radii = radii[visible]
+        # pos already includes this tick's vel, so step back to interpolate
+        corners = (self.pos[:n][visible] - self.vel[:n][visible] * (1 - alpha)).astype(np.int32)
+        corners -= radii[:, None]  # circle sprites are blitted by their top-left corner
+        sprites = self.sprites
+        batch = []
+        for corner, r, c in zip(corners.tolist(), radii.tolist(), self.color[:n][visible].tolist()):
+            sprite = sprites.get((c, r))
+            if sprite is None:
+                sprite = sprites[(c, r)] = get_circle(self.colors[c], r)
+            batch.append((sprite, corner))
+        return surf.blits(batch)
@@ -0,0 +1,56 @@
+"""
+Object pool for things that are spawned and removed all the time (stars, bombs).
+
+Live objects sit in a dense list. Removing one swaps it with the last object and
+pops it (O(1), no list copy), and the removed object goes on a free list so the
+next spawn reuses it instead of allocating a new one.
+
+    stars = Pool(pygame.Rect, pygame.Rect.update)
+    stars.spawn(x, 0, 20, 20)          # new Rect, or a recycled one updated in place
+    for i in range(len(stars) - 1, -1, -1):
+        if stars[i].y > HEIGHT:
+            stars.release_at(i)
+
+Walk the pool backwards when releasing inside a loop: the object swapped into
+slot i comes from the end, which has already been visited.
+"""
+
+
+class Pool:
+    # create(*args) builds a new object, reset(obj, *args) re-initialises a
+    # recycled one with the same arguments
+    def __init__(self, create, reset):
+        self.create = create
+        self.reset = reset
+        self.active = []
+        self.free = []
+
+    def __len__(self):
+        return len(self.active)
+
+    def __iter__(self):
+        return iter(self.active)
+
+    def __getitem__(self, index):
+        return self.active[index]
+
+    def spawn(self, *args):
+        if self.free:
+            obj = self.free.pop()
+            self.reset(obj, *args)
+        else:
+            obj = self.create(*args)
+        self.active.append(obj)
+        return obj
+
+    def release_at(self, index):
+        active = self.active
+        obj = active[index]
+        last = active.pop()
+        if index < len(active):
+            active[index] = last
+        self.free.append(obj)
+
+    def clear(self):
+        self.free.extend(self.active)
+        self.active.clear()
@@ -0,0 +1,133 @@
+"""
+Per-phase frame timing with an on-screen overlay.
+
+The main loop calls mark(phase) after each part of the frame; the time since the
+previous mark is added to that phase (so phases that run once per tick add up
+over the frame). end_frame() closes the frame and records entity counts:
+
+    profiler = FrameProfiler(enabled=True)
+    handle_events();  profiler.mark("events")
+    update();         profiler.mark("update")
+    draw();           profiler.mark("draw")
+    profiler.end_frame(stars=len(stars))
+
+The last `history` frames of every phase are kept for percentiles (p50/p95/p99),
+and with keep_records=True every frame is kept for export() to CSV or JSON
+(one row per frame: "<phase>_ms" columns and the counts).
+When disabled, mark() and end_frame() return straight away.
+"""
+import csv
+import json
+import time
+from collections import deque
+
+from .hud import Hud
+
+perf_counter = time.perf_counter
+
+
+# Nearest-rank percentiles of the values, e.g. percentiles(times, (50, 99)) -> [p50, p99];
+# 0.0 for each point when there are no values. Every timing summary uses this one.
+def percentiles(values, points=(50, 95, 99)):
+    values = sorted(values)
+    if not values:
+        return [0.0 for _ in points]
+    last = len(values) - 1
+    return [values[min(last, round(last * p / 100))] for p in points]
+
+
+class FrameProfiler:
+    def __init__(self, enabled=False, history=300, keep_records=False, refresh_frames=30):
+        self.enabled = enabled or keep_records
+        self.show_overlay = False
+        self.history = history
+        self.refresh_frames = refresh_frames  # overlay numbers change every this many frames
+        self.samples = {}  # phase -> deque of milliseconds, "total" is the whole frame
+        self.counts = {}
+        self.records = [] if keep_records else None
+        self.frame = {}
+        self.frame_index = 0
+        self.frame_start = self.last = perf_counter()
+        self.hud = Hud()
+        self.lines = []
+
+    def mark(self, phase):
+        if not self.enabled:
+            return
+        now = perf_counter()
+        frame = self.frame
+        frame[phase] = frame.get(phase, 0.0) + (now - self.last)
+        self.last = now
+
+    def end_frame(self, **counts):
+        if not self.enabled:
+            return
+        now = perf_counter()
+        frame = self.frame
+        frame["total"] = now - self.frame_start
+        for phase in frame:
+            if phase not in self.samples:
+                self.samples[phase] = deque(maxlen=self.history)
+        # Phases that did not run this frame (no ticks due) count as 0 ms
+        for phase, samples in self.samples.items():
+            samples.append(frame.get(phase, 0.0) * 1000)
+        self.counts = counts
+        if self.records is not None:
+            record = {"frame": self.frame_index}
+            record.update((phase + "_ms", round(seconds * 1000, 3)) for phase, seconds in frame.items())
+            record.update(counts)
+            self.records.append(record)
+        self.frame_index += 1
+        self.frame = {}
+        self.frame_start = self.last = now
+
+    # Drops the frame so far without recording it (menus, loading screens)
+    def skip_frame(self):
+        self.frame = {}
+        self.frame_start = self.last = perf_counter()
+
+    # Overlay on/off (F3 in the games); profiling runs while it is shown
+    def toggle_overlay(self):
+        self.show_overlay = not self.show_overlay
+        self.enabled = self.show_overlay or self.records is not None
+        self.skip_frame()
+
+    def percentiles(self, phase, points=(50, 95, 99)):
+        return percentiles(self.samples.get(phase, ()), points)
+
+    # One line per phase: "update    0.41  0.90  1.52 ms", then the counts
+    def summary(self):
+        lines = ["phase       p50   p95   p99 ms"]
+        for phase in self.samples:
+            p50, p95, p99 = self.percentiles(phase)
+            lines.append(f"{phase:<9}{p50:6.2f}{p95:6.2f}{p99:6.2f}")
+        if self.counts:
+            lines.append("  ".join(f"{name}: {value}" for name, value in self.counts.items()))
+        return lines
+
+    # Draws the overlay text at pos; returns the drawn rects (for the renderer)
+    def draw(self, surf, font, pos=(10, 10), color=(255, 255, 0)):
+        if not self.show_overlay:
+            return []
+        if not self.lines or self.frame_index % self.refresh_frames == 0:
+            self.lines = self.summary()
+        x, y = pos
+        drawn = []
+        for i, line in enumerate(self.lines):
+            text = self.hud.text(i, font, line, color)
+            drawn.append(surf.blit(text, (x, y)))
+            y += text.get_height()
+        return drawn
+
+    # Writes the kept frame records; the file type comes from the extension
+    def export(self, path):
+        records = self.records or []
+        if path.endswith(".json"):
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(records, f)
+            return
+        fields = list(dict.fromkeys(key for record in records for key in record))
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=fields, restval=0)
+            writer.writeheader()
+            writer.writerows(records)
@@ -0,0 +1,104 @@
+"""
+Scales the cost of visual effects to hold the frame budget.
+
+The governor watches how long recent frames took (the work, not the wait for
+the frame cap) and steps the quality level down when they run over budget, and
+back up once there has been headroom for a while:
+
+    quality = QualityGovernor(budget_ms=1000 / 60)
+    while running:
+        quality.begin()
+        ...update and draw, using quality.particles(n), quality.simple_sprites...
+        quality.end()
+        clock.tick(RENDER_FPS)
+
+Only effects change: fewer and shorter-lived particles, plain blocks instead of
+shaped sprites and no full-screen overlays. Gameplay never reads the level.
+Stepping down takes a short run of slow frames, stepping up a long run of fast
+ones and longer still after a step up had to be undone, so the level settles
+instead of flipping back and forth.
+"""
+import time
+from collections import deque
+
+# (particle share, particle life share, simple sprites, overlays) per level, best first
+LEVELS = (
+    (1.0, 1.0, False, True),
+    (0.5, 0.75, False, True),
+    (0.25, 0.5, True, True),
+    (0.1, 0.5, True, False),
+)
+
+
+class QualityGovernor:
+    # Frames are over budget when the average of the last `window` is above
+    # lower_at * budget; after raise_after frames below raise_at * budget the
+    # level goes back up. adaptive=False keeps the level fixed.
+    def __init__(self, budget_ms=1000 / 60, adaptive=True, level=0, window=30, lower_at=0.9, raise_at=0.5,
+                 raise_after=120):
+        self.budget_ms = budget_ms
+        self.adaptive = adaptive
+        self.window = window
+        self.lower_at = lower_at
+        self.raise_at = raise_at
+        self.base_raise_after = self.raise_after = raise_after
+        self.frames = deque(maxlen=window)
+        self.calm_frames = 0
+        self.since_raise = None  # frames since the last step up
+        self.started = None
+        self.set_level(level)
+
+    def set_level(self, level):
+        self.level = max(0, min(level, len(LEVELS) - 1))
+        self.particle_share, self.life_share, self.simple_sprites, self.overlays = LEVELS[self.level]
+
+    # Number of particles to emit instead of count (at least one)
+    def particles(self, count):
+        return max(1, int(count * self.particle_share))
+
+    # Particle lifetime range (in ticks) to use instead of life
+    def life(self, life):
+        return (max(1, int(life[0] * self.life_share)), max(1, int(life[1] * self.life_share)))
+
+    def begin(self):
+        self.started = time.perf_counter()
+
+    # Closes the frame started with begin() and returns its work time in ms
+    def end(self):
+        if self.started is None:
+            return 0.0
+        frame_ms = (time.perf_counter() - self.started) * 1000
+        self.started = None
+        self.update(frame_ms)
+        return frame_ms
+
+    def update(self, frame_ms):
+        if not self.adaptive:
+            return
+        frames = self.frames
+        frames.append(frame_ms)
+        if self.since_raise is not None:
+            self.since_raise += 1
+        if len(frames) < self.window:
+            return
+        average = sum(frames) / len(frames)
+        if average > self.budget_ms * self.lower_at and self.level < len(LEVELS) - 1:
+            if self.since_raise is not None and self.since_raise < self.raise_after:
+                # The last step up did not fit: wait longer before the next one
+                self.raise_after = min(self.raise_after * 2, self.base_raise_after * 8)
+            self.set_level(self.level + 1)
+            self._restart()
+            self.since_raise = None
+        elif average < self.budget_ms * self.raise_at and self.level > 0:
+            self.calm_frames += 1
+            if self.calm_frames >= self.raise_after:
+                self.set_level(self.level - 1)
+                self._restart()
+                self.since_raise = 0
+        else:
+            self.calm_frames = 0
+
+    # Measure the new level from scratch
+    def _restart(self):
+        self.frames.clear()
+        self.calm_frames = 0
@@ -0,0 +1,71 @@
+"""
+Full-frame or dirty-rectangle drawing.
+
+Normally every frame fills the whole screen and flips it. With dirty=True only
+the areas that changed are cleared and sent to the display: whatever was drawn
+last frame is painted over with the background, the new frame is drawn, and
+pygame.display.update() gets the old and new rects instead of the full screen.
+On big displays driven by slow machines this is much cheaper than flip().
+
+    renderer = Renderer(BACKGROUND, dirty=True)
+    renderer.begin(screen)
+    renderer.add(pygame.draw.rect(screen, color, rect))   # draw calls return their rect
+    renderer.add(screen.blit(text, (20, 20)))
+    renderer.present()
+
+In full-frame mode add() does nothing, so the same drawing code works for both.
+The background is a colour, or an object with draw(surf) and restore(surf, rect)
+such as common.starfield.Starfield.
+"""
+import pygame
+
+
+class Renderer:
+    # max_rects: above this many rects one flip() is cheaper than update(rects)
+    def __init__(self, background, dirty=False, max_rects=400):
+        self.background = background
+        self.dirty = dirty
+        self.max_rects = max_rects
+        self.prev_rects = []    # what was drawn last frame (erased this frame)
+        self.rects = []         # what has been drawn this frame
+        self.full = True        # next frame must redraw and send the whole screen
+
+    # Forget what is on screen, e.g. after a menu was drawn without the renderer
+    def invalidate(self):
+        self.full = True
+
+    def begin(self, surf):
+        background = self.background
+        if hasattr(background, "draw"):
+            if not self.dirty or self.full:
+                background.draw(surf)
+            else:
+                for rect in self.prev_rects:
+                    background.restore(surf, rect)
+        elif not self.dirty or self.full:
+            surf.fill(background)
+        else:
+            fill = surf.fill
+            for rect in self.prev_rects:
+                fill(background, rect)
+
+    def add(self, rect):
+        if self.dirty:
+            self.rects.append(rect)
+
+    def add_all(self, rects):
+        if self.dirty:
+            self.rects.extend(rects)
+
+    def present(self):
+        if not self.dirty:
+            pygame.display.flip()
+            return
+        changed = self.prev_rects + self.rects
+        if self.full or len(changed) > self.max_rects:
+            pygame.display.flip()
+        else:
+            pygame.display.update(changed)
+        self.prev_rects = self.rects
+        self.rects = []
+        self.full = False
@@ -0,0 +1,128 @@
+"""
+A ring buffer of game snapshots, and resume files.
+
+A game that can snapshot its whole state to bytes (see Game.snapshot() in
+game2) keeps one every few ticks here; the oldest ones drop out, so the ring
+always covers the last few seconds:
+
+    ring = SnapshotRing(seconds=5, every=6)        # 50 snapshots at 60 ticks/s
+    if ring.due(tick):
+        ring.push(tick, game.snapshot())
+    game.restore(ring.back(tick, 3 * 60))          # about 3 seconds ago
+
+The same bytes work for a resume file written now and then during play, and
+for rolling back to a confirmed tick in networked play. SnapshotWriter writes
+the resume file on a background thread, so the tick loop never waits on disk:
+
+    resume = SnapshotWriter("resume.snap")
+    resume.save(game.snapshot())                    # every few seconds
+    resume.remove()                                 # game over, nothing to resume
+    resume.close()                                  # finishes the last write
+"""
+import os
+import sys
+import threading
+from collections import deque
+
+TICKS_PER_SECOND = 60
+
+
+class SnapshotRing:
+    def __init__(self, seconds=5, every=6):
+        self.every = every
+        self.snapshots = deque(maxlen=max(1, seconds * TICKS_PER_SECOND // every))  # (tick, bytes), oldest first
+
+    def __len__(self):
+        return len(self.snapshots)
+
+    def due(self, tick):
+        return tick % self.every == 0
+
+    def push(self, tick, data):
+        self.snapshots.append((tick, data))
+
+    def latest(self):
+        return self.snapshots[-1][1] if self.snapshots else None
+
+    # Newest snapshot at least `ticks` before `tick` (the oldest one if the ring
+    # does not go back that far). Newer snapshots are dropped, as they are in
+    # the future once the game is back there; None if the ring is empty.
+    def back(self, tick, ticks):
+        snapshots = self.snapshots
+        while len(snapshots) > 1 and snapshots[-1][0] > tick - ticks:
+            snapshots.pop()
+        return snapshots[-1][1] if snapshots else None
+
+    def clear(self):
+        self.snapshots.clear()
+
+
+# Writes a snapshot so that a crash never leaves a half-written file behind
+def save_snapshot(path, data):
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as f:
+        f.write(data)
+    os.replace(temp_path, path)
+
+
+def load_snapshot(path):
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def remove_snapshot(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+_REMOVE = object()  # queued instead of bytes: delete the file
+
+
+class SnapshotWriter:
+    # Only the newest request is carried out: a save() that is still waiting
+    # when the next save() or remove() comes in is dropped
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._pending = None  # bytes, _REMOVE or None
+        self._thread = threading.Thread(target=self._run, name="SnapshotWriter", daemon=True)
+        self._thread.start()
+
+    def save(self, data):
+        self._request(data)
+
+    def remove(self):
+        self._request(_REMOVE)
+
+    def _request(self, pending):
+        with self._lock:
+            self._pending = pending
+        self._wake.set()
+
+    def close(self):
+        self._stop.set()
+        self._wake.set()
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            with self._lock:
+                pending, self._pending = self._pending, None
+            try:
+                if pending is _REMOVE:
+                    remove_snapshot(self.path)
+                elif pending is not None:
+                    save_snapshot(self.path, pending)
+            except OSError as e:
+                print(f"Could not save {self.path}: {e}", file=sys.stderr)
+            if self._stop.is_set() and self._pending is None:
+                return
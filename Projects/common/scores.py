@@ -0,0 +1,178 @@
+"""
+High score and results storage that never blocks the game loop.
+
+Everything is kept in memory; a background thread writes the changes to disk.
+The high score file is replaced atomically (write a temp file, then rename), so
+a crash leaves either the old or the new score, never half a file. Finished
+games are appended to a log, one JSON line each, and a cut-off last line from a
+crash is skipped when the log is read back.
+
+Top scores are indexed per team and per player as results come in, so the
+leaderboard is a slice of a sorted list no matter how many rounds were played:
+
+    store = ScoreStore("highscore.txt", "scores.log")
+    store.set_highscore(score)                          # cheap, call every tick if you like
+    store.add_result(score, team="G9A Team 3", player="lamar")
+    store.top(5, team="G9A Team 3")                     # [(score, team, player), ...]
+    store.close()                                       # writes whatever is left
+
+Print the leaderboards from a log:  python -m common.scores game1/scores.log
+"""
+import argparse
+import bisect
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+
+
+class ScoreStore:
+    # highscore_path / log_path may be None to skip that file. keep is how many
+    # results each leaderboard remembers; write_interval batches writes that
+    # come in quick succession (a record being beaten every tick)
+    def __init__(self, highscore_path=None, log_path=None, keep=100, write_interval=1.0):
+        self.highscore_path = highscore_path
+        self.log_path = log_path
+        self.keep = keep
+        self.write_interval = write_interval
+        self.highscore = self._read_highscore()
+        self.boards = {}  # (team, player) with None as "any" -> [(-score, seq, team, player)]
+        self._seq = itertools.count()
+        self._torn_line = False  # the log ends in a half-written line
+        for result in self._read_log():
+            self._index(result["score"], result.get("team"), result.get("player"))
+
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._pending_highscore = None
+        self._pending_lines = []
+        self._thread = threading.Thread(target=self._run, name="ScoreStore", daemon=True)
+        self._thread.start()
+
+    def _read_highscore(self):
+        if not self.highscore_path or not os.path.exists(self.highscore_path):
+            return 0
+        try:
+            with open(self.highscore_path, "r") as f:
+                return int(f.read().strip() or 0)
+        except (OSError, ValueError) as e:
+            print(f"Could not read {self.highscore_path}: {e}", file=sys.stderr)
+            return 0
+
+    def _read_log(self):
+        if not self.log_path or not os.path.exists(self.log_path):
+            return []
+        results = []
+        with open(self.log_path, "r", encoding="utf-8") as f:
+            for line in f:
+                self._torn_line = not line.endswith("\n")
+                try:
+                    results.append(json.loads(line))
+                except ValueError:
+                    continue  # line cut off by a crash
+        return results
+
+    def _index(self, score, team, player):
+        entry = (-score, next(self._seq), team, player)
+        keys = {(None, None), (team, None), (team, player)}
+        for key in keys:
+            board = self.boards.get(key)
+            if board is None:
+                board = self.boards[key] = []
+            if len(board) < self.keep or entry < board[-1]:
+                bisect.insort(board, entry)
+                if len(board) > self.keep:
+                    board.pop()
+
+    # Raises the in-memory high score; the file is written in the background
+    def set_highscore(self, score):
+        if score <= self.highscore:
+            return
+        self.highscore = score
+        if self.highscore_path:
+            with self._lock:
+                self._pending_highscore = score
+            self._wake.set()
+
+    # Records a finished game and updates the leaderboards straight away
+    def add_result(self, score, team=None, player=None):
+        self._index(score, team, player)
+        self.set_highscore(score)
+        if self.log_path:
+            line = json.dumps({"time": round(time.time()), "score": score, "team": team, "player": player})
+            with self._lock:
+                self._pending_lines.append(line + "\n")
+            self._wake.set()
+
+    # Best n results as (score, team, player); team/player None means any
+    def top(self, n=10, team=None, player=None):
+        board = self.boards.get((team, player), [])
+        return [(-neg_score, t, p) for neg_score, _, t, p in board[:n]]
+
+    def teams(self):
+        return [team for team, player in self.boards if team is not None and player is None]
+
+    def close(self):
+        self._stop.set()
+        self._wake.set()
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            with self._lock:
+                highscore, self._pending_highscore = self._pending_highscore, None
+                lines, self._pending_lines = self._pending_lines, []
+            try:
+                if highscore is not None:
+                    self._write_highscore(highscore)
+                if lines:
+                    self._append_log(lines)
+            except OSError as e:
+                print(f"Could not save scores: {e}", file=sys.stderr)
+            if self._stop.is_set():
+                if self._pending_highscore is None and not self._pending_lines:
+                    return
+                continue
+            # Let more changes pile up before writing again (close() cuts this short)
+            self._stop.wait(self.write_interval)
+
+    def _write_highscore(self, score):
+        temp_path = self.highscore_path + ".tmp"
+        with open(temp_path, "w") as f:
+            f.write(str(score))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.highscore_path)
+
+    def _append_log(self, lines):
+        with open(self.log_path, "a", encoding="utf-8") as f:
+            if self._torn_line:
+                f.write("\n")  # don't glue the first new result onto the broken line
+                self._torn_line = False
+            f.writelines(lines)
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Print the leaderboards stored in a scores log")
+    parser.add_argument("log", help="scores log written by a game, e.g. game1/scores.log")
+    parser.add_argument("--top", type=int, default=5)
+    args = parser.parse_args()
+
+    store = ScoreStore(log_path=args.log)
+    for team in [None] + sorted(store.teams()):
+        print(team or "Everyone")
+        for rank, (score, result_team, player) in enumerate(store.top(args.top, team), 1):
+            names = [name for name in (result_team if team is None else None, player) if name]
+            print(f"  {rank}. {score}  {' - '.join(names)}")
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Uniform spatial hash ("grid") for broad-phase collision checks.
+
+The screen is split into square cells. Each tick the grid is cleared and every
+moving object is inserted into the cells its rect covers; a paddle then only
+has to test the objects found in its own cells instead of every object:
+
+    grid.clear()
+    for i, star in enumerate(stars):
+        grid.insert(i, star)
+    for i in grid.query(paddle):
+        if stars[i].colliderect(paddle): ...
+"""
+
+
+class SpatialGrid:
+    def __init__(self, cell_size):
+        self.cell_size = cell_size
+        self.cells = {}
+
+    def clear(self):
+        self.cells.clear()
+
+    def _cell_range(self, rect):
+        size = self.cell_size
+        return (rect.left // size, (rect.right - 1) // size,
+                rect.top // size, (rect.bottom - 1) // size)
+
+    # item must be hashable (an index or id works well)
+    def insert(self, item, rect):
+        cells = self.cells
+        x0, x1, y0, y1 = self._cell_range(rect)
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                cell = cells.get((cx, cy))
+                if cell is None:
+                    cells[(cx, cy)] = [item]
+                else:
+                    cell.append(item)
+
+    # Returns every item sharing a cell with rect (candidates, not confirmed hits)
+    def query(self, rect):
+        cells = self.cells
+        found = []
+        seen = set()
+        x0, x1, y0, y1 = self._cell_range(rect)
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                for item in cells.get((cx, cy), ()):
+                    if item not in seen:
+                        seen.add(item)
+                        found.append(item)
+        return found
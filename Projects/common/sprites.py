@@ -0,0 +1,72 @@
+"""
+Pre-rendered sprites for drawing many objects with one Surface.blits() call.
+
+pygame.draw builds every shape again each frame, and each object costs one
+Python call. Instead each shape (kind, colour, size) is drawn once onto its own
+surface, converted to the display's pixel format, and reused. A whole layer of
+objects is then drawn with a single blits() call:
+
+    star = get_rect(YELLOW, (30, 30), border_radius=6)   # look up once, e.g. at spawn
+    screen.blits([(star, (x, y)) for x, y in positions])
+
+Shapes that need more than one draw call (e.g. game2's bomb and its fuse) can
+be cached with get_sprite(key, build), where build() returns the surface.
+"""
+import pygame
+
+_sprites = {}
+
+
+def _finish(surface):
+    # convert_alpha() needs a display mode; headless runs keep the plain surface
+    if pygame.display.get_surface() is not None:
+        return surface.convert_alpha()
+    return surface
+
+
+# Returns the cached sprite for key, calling build() the first time
+def get_sprite(key, build):
+    sprite = _sprites.get(key)
+    if sprite is None:
+        sprite = _sprites[key] = _finish(build())
+    return sprite
+
+
+# Filled rectangle of the given size, optionally with rounded corners
+def get_rect(color, size, border_radius=0):
+    key = ("rect", tuple(color), tuple(size), border_radius)
+    sprite = _sprites.get(key)
+    if sprite is None:
+        sprite = pygame.Surface(size, pygame.SRCALPHA)
+        pygame.draw.rect(sprite, color, sprite.get_rect(), border_radius=border_radius)
+        sprite = _sprites[key] = _finish(sprite)
+    return sprite
+
+
+# Opaque filled rectangle: no per-pixel alpha, so it is the cheapest sprite to blit
+def get_block(color, size):
+    key = ("block", tuple(color), tuple(size))
+    sprite = _sprites.get(key)
+    if sprite is None:
+        sprite = pygame.Surface(size)
+        sprite.fill(color)
+        if pygame.display.get_surface() is not None:
+            sprite = sprite.convert()
+        _sprites[key] = sprite
+    return sprite
+
+
+# Filled circle; blit it at (x - radius, y - radius) to centre it on (x, y)
+def get_circle(color, radius):
+    key = ("circle", tuple(color), radius)
+    sprite = _sprites.get(key)
+    if sprite is None:
+        sprite = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+        pygame.draw.circle(sprite, color, (radius, radius), radius)
+        sprite = _sprites[key] = _finish(sprite)
+    return sprite
+
+
+def clear():
+    # Call after changing the display mode so sprites are converted again
+    _sprites.clear()
@@ -0,0 +1,104 @@
+"""
+Parallax starfield background, drawn with a few blits per frame.
+
+Each layer's stars are drawn once onto a surface the size of the screen. The
+far layer is opaque and replaces the background fill; nearer layers use a
+colour key with RLE acceleration, so blitting them only touches the star pixels.
+Scrolling a layer is two blits of the same surface (the part that wrapped
+around goes on top), so a frame costs 2 blits per layer however many stars
+there are. The layers are built again only when the screen size changes.
+
+A Starfield can be given to Renderer instead of a background colour:
+
+    background = Starfield(COLOR_BG)
+    renderer = Renderer(background)
+    ...
+    background.advance(0.5 if slow_time else 1.0)   # once per game tick
+    renderer.begin(screen)                          # draws the starfield
+
+With scroll=False the layers are merged into one still image; this is what
+dirty-rectangle mode needs, as it only repaints the areas that changed.
+"""
+import random
+
+import pygame
+
+# (stars on a 1920x1080 screen, size, brightness, pixels per tick), far to near
+LAYERS = (
+    (220, 1, 90, 0.2),
+    (90, 2, 150, 0.5),
+    (30, 2, 230, 1.1),
+)
+COLOR_KEY = (255, 0, 255)  # transparent on the near layers
+REFERENCE_AREA = 1920 * 1080
+
+
+class Starfield:
+    def __init__(self, color, layers=LAYERS, seed=1, scroll=True):
+        self.color = color
+        self.layers = layers
+        self.seed = seed
+        self.scroll = scroll
+        self.size = None
+        self.surfaces = []  # one per layer, built for self.size
+        self.offsets = [0.0] * len(layers)
+
+    # Moves every layer on by its speed times `speed` (call once per game tick)
+    def advance(self, speed=1.0):
+        if not self.scroll or self.size is None:
+            return
+        height = self.size[1]
+        for i, layer in enumerate(self.layers):
+            self.offsets[i] = (self.offsets[i] + layer[3] * speed) % height
+
+    def _build(self, size):
+        self.size = size
+        width, height = size
+        rng = random.Random(self.seed)  # its own stream, so game randomness is not touched
+        display = pygame.display.get_surface() is not None
+        self.surfaces = []
+        for i, (count, star_size, brightness, _) in enumerate(self.layers):
+            surface = pygame.Surface(size)
+            far = i == 0  # the nearer layers are see-through, also when merged into a still image
+            if far:
+                surface.fill(self.color)
+            else:
+                surface.fill(COLOR_KEY)
+            color = (brightness, brightness, min(255, brightness + 25))
+            for _ in range(round(count * width * height / REFERENCE_AREA)):
+                surface.fill(color, (rng.randrange(width), rng.randrange(height), star_size, star_size))
+            if display:
+                surface = surface.convert()
+            if not far:
+                surface.set_colorkey(COLOR_KEY, pygame.RLEACCEL)
+            self.surfaces.append(surface)
+        if not self.scroll:
+            # One still image: the later layers drawn onto the first
+            still = self.surfaces[0]
+            for surface in self.surfaces[1:]:
+                still.blit(surface, (0, 0))
+            self.surfaces = [still]
+
+    def draw(self, surf):
+        if surf.get_size() != self.size:
+            self._build(surf.get_size())
+        if not self.scroll:
+            return surf.blit(self.surfaces[0], (0, 0))
+        height = self.size[1]
+        for surface, offset in zip(self.surfaces, self.offsets):
+            y = int(offset)
+            surf.blit(surface, (0, y))
+            surf.blit(surface, (0, y - height))
+        return surf.get_rect()
+
+    # Paints the background back over rect (used by dirty-rectangle mode)
+    def restore(self, surf, rect):
+        if surf.get_size() != self.size:
+            self._build(surf.get_size())
+        if not self.scroll:
+            return surf.blit(self.surfaces[0], rect, rect)
+        clip = surf.get_clip()
+        surf.set_clip(rect)
+        self.draw(surf)
+        surf.set_clip(clip)
+        return pygame.Rect(rect)
@@ -0,0 +1,34 @@
+"""
+Measures how long a game takes from launch to its first frame on screen.
+
+Import this module first, call mark() after each start-up step and report()
+once the first frame has been shown:
+
+    from common import startup
+    ...
+    startup.mark("display")
+    startup.report()      # Startup 182 ms: imports 80, display 50, fonts 2, first frame 50
+"""
+import time
+
+_last = _start = time.perf_counter()
+_steps = []
+_reported = False
+
+
+def mark(step):
+    global _last
+    now = time.perf_counter()
+    _steps.append((step, now - _last))
+    _last = now
+
+
+def report():
+    global _reported
+    if _reported:
+        return
+    _reported = True
+    mark("first frame")
+    total = sum(seconds for _, seconds in _steps)
+    steps = ", ".join(f"{step} {seconds * 1000:.0f}" for step, seconds in _steps)
+    print(f"Startup {total * 1000:.0f} ms: {steps}")
@@ -0,0 +1,50 @@
+"""
+Reads the competition roster in Projects/game0/teams.txt.
+
+The file groups teams by class ("#### G9A ####"), each team starts with a
+"> Team 1 > doing > done" line (the status notes after the name are ignored)
+followed by one member per line. Teams are named "<class> <team>", e.g.
+"G9A Team 3".
+"""
+import os
+import re
+
+ROSTER_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "game0", "teams.txt")
+
+
+def _member_name(line):
+    # Drop notes written after a name: "yamen\t\tg9a", "Mohamed tamer * 100", "Mohamed baher   80"
+    name = re.split(r"\t|\*", line)[0]
+    return re.sub(r"\s+\d+$", "", name).strip()
+
+
+# Returns {"G9A Team 3": ["nada desoky", ...], ...} in file order, empty teams included
+def load_roster(path=ROSTER_FILE):
+    roster = {}
+    group = None
+    team = None
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            text = line.strip()
+            if not text:
+                continue
+            if text.startswith("#"):
+                group = text.strip("# ")
+                team = None
+            elif text.startswith(">"):
+                team = f"{group} {text.split('>')[1].strip()}" if group else text.split(">")[1].strip()
+                roster[team] = []
+            elif team is not None:
+                name = _member_name(text)
+                if name:
+                    roster[team].append(name)
+    return roster
+
+
+# Case-insensitive lookup, returns the roster's spelling of the team name or None
+def find_team(roster, name):
+    wanted = " ".join(name.lower().split())
+    for team in roster:
+        if team.lower() == wanted:
+            return team
+    return None
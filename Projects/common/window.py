@@ -0,0 +1,37 @@
+"""
+Fullscreen windows at a fixed game resolution.
+
+By default a game draws at the monitor's resolution, so a 4K panel costs four
+times the fill and flip work of 1080p, and a wider screen gives the player more
+room. With a fixed size the game draws at that size and SDL scales the finished
+frame to the monitor once per frame (pygame.SCALED, on the GPU where
+available). Mouse positions come back in game coordinates, so gameplay does not
+depend on the monitor at all:
+
+    parser.add_argument("--resolution", type=parse_size)       # e.g. 1280x720
+    screen = open_fullscreen(args.resolution)
+    width, height = screen.get_size()
+"""
+import argparse
+
+import pygame
+
+
+# argparse type for "1280x720"
+def parse_size(text):
+    try:
+        width, height = (int(part) for part in text.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected WIDTHxHEIGHT, e.g. 1280x720, not {text!r}")
+    if width <= 0 or height <= 0:
+        raise argparse.ArgumentTypeError(f"resolution must be positive: {text!r}")
+    return width, height
+
+
+# Opens the fullscreen window: at the monitor's resolution, or drawn at `size` and scaled up
+def open_fullscreen(size=None):
+    pygame.display.init()
+    if size is None:
+        info = pygame.display.Info()
+        return pygame.display.set_mode((info.current_w, info.current_h), pygame.FULLSCREEN)
+    return pygame.display.set_mode(size, pygame.FULLSCREEN | pygame.SCALED)
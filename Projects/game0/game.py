@@ -9,81 +9,245 @@ Also, the game loop should maintain consistent frame rates, and the game window
 
 # run this command in the terminal to install pygame: python -m pip install pygame
 ################### Part 1 - Import necessary modules ###################
+# Lets us import the shared helpers from the Projects/common folder
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common import startup        # Imported first, so the start-up time it reports includes loading pygame
 import pygame
 import random
-import sys
-# Initialize pygame
-pygame.init()
+import argparse
+from common.loop import FixedTimestep, lerp
+from common.pool import Pool
+from common.spatial import SpatialGrid
+from common.teams import load_roster, find_team
+from common.render import Renderer
+from common.profiler import FrameProfiler
+from common.latency import LatencyProbe, allow_events
+from common.audio import Audio
+from common.starfield import Starfield
+from common.levels import load_level, LevelError
+# Importing this file only defines things - the window opens when main() runs (at the bottom)
 # Constants - these values don't change during the game
 WIDTH, HEIGHT = 800, 600          # The width and height of the game window in pixels
-FPS = 60                          # Frames Per Second - controls how smooth the game runs
+FPS = 60                          # Game steps per second - the game always runs at this speed
+RENDER_FPS = 240                  # Max frames drawn per second (0 = as fast as the screen allows)
 PLAYER_WIDTH, PLAYER_HEIGHT = 100, 20  # Size of the player's paddle
 STAR_SIZE = 20                    # Size of the falling stars
+GRID_CELL_SIZE = 100              # Size of one collision grid cell (about one paddle wide)
 WHITE = (255, 255, 255)           # RGB color codes (Red, Green, Blue) for white
 BLACK = (0, 0, 0)                 # RGB color for black
 STAR_COLOR = (255, 215, 0)        # RGB color for gold/yellow stars
 PLAYER_COLOR = (0, 255, 0)        # RGB color for green player
-# Screen setup - creates the game window
-screen = pygame.display.set_mode((WIDTH, HEIGHT))      # Creates the game window with specified dimensions
-pygame.display.set_caption("Catch the Falling Stars")  # Sets the title of the game window
-clock = pygame.time.Clock()                            # Creates a clock to control game timing and framerate
-
-################### Part 2 - Game setup - initialize game variables ###################
-font = pygame.font.SysFont(None, 36)            # Sets up a system font with size 36 for displaying text on screen
-# Creates a rectangle for the player's paddle at the bottom center of screen
-player = pygame.Rect(WIDTH // 2 - PLAYER_WIDTH // 2, HEIGHT - 50, PLAYER_WIDTH, PLAYER_HEIGHT)
+TEAM_COLORS = [(0, 255, 0), (0, 200, 255), (255, 100, 200), (255, 140, 0), (180, 120, 255), (255, 255, 255)]
+# Left/right keys for each paddle, in order (the first paddle always uses the arrow keys)
+PADDLE_KEYS = [(pygame.K_LEFT, pygame.K_RIGHT), (pygame.K_a, pygame.K_d), (pygame.K_j, pygame.K_l),
+               (pygame.K_KP4, pygame.K_KP6), (pygame.K_z, pygame.K_c), (pygame.K_v, pygame.K_n),
+               (pygame.K_q, pygame.K_e), (pygame.K_u, pygame.K_o)]
 player_speed = 7                  # How fast the player moves left/right when keys are pressed
 # Stars - setup for falling star objects
-stars = []                        # Empty list to store all active stars
-star_fall_speed = 5               # How fast stars fall down the screen
-score = 0                         # Player's current score (starts at 0)
-missed = 0                        # Count   of missed stars (starts at 0)
-running = True
+# A pool keeps the active stars and recycles removed ones, so we don't create a new Rect for every star
+stars = Pool(pygame.Rect, pygame.Rect.update)
+# The collision grid: instead of checking every star against every paddle, each paddle only
+# checks the stars in the grid cells it covers
+grid = SpatialGrid(GRID_CELL_SIZE)
 # Function to create a new star
 def create_star():
     x = random.randint(0, WIDTH - STAR_SIZE)        # Random x position within screen width
-    rect = pygame.Rect(x, 0, STAR_SIZE, STAR_SIZE)  # Create rectangle at top of screen with random x position
-    return rect                                     # Return the new star object
+    return stars.spawn(x, 0, STAR_SIZE, STAR_SIZE)  # Get a star rectangle at the top of the screen from the pool
+
+def main():
+    # Team mode - every member of each team gets a paddle, and every team has its own score.
+    # Example: python game.py "G9A Team 3" "G10A Team 1"   (team names come from teams.txt)
+    parser = argparse.ArgumentParser(description="Catch the Falling Stars")
+    parser.add_argument("teams", nargs="*", help="team names from teams.txt, e.g. \"G9A Team 3\"")
+    parser.add_argument("--dirty", action="store_true", help="only redraw the parts of the screen that changed")
+    parser.add_argument("--profile", action="store_true", help="show frame timings (F3 toggles them)")
+    parser.add_argument("--profile-out", help="save per-frame timings to this .csv or .json file on exit")
+    parser.add_argument("--low-latency", action="store_true", help="show key presses as soon as possible")
+    parser.add_argument("--no-sound", action="store_true", help="play no sound effects")
+    parser.add_argument("--level", default="game0", help="level file, or the name of one in Projects/levels")
+    args = parser.parse_args()
+    # The level says how often stars appear and how fast they fall (see Projects/levels/game0.json)
+    try:
+        level = load_level(args.level)
+    except LevelError as e:
+        print(f"Bad level: {e}")
+        sys.exit(1)
+    startup.mark("imports")          # Time spent loading Python, pygame and our modules
+    # Initialize only the parts of pygame we use (pygame.init() also starts joysticks; Audio starts the sound)
+    pygame.display.init()
+    pygame.font.init()
+    # Screen setup - creates the game window
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))      # Creates the game window with specified dimensions
+    pygame.display.set_caption("Catch the Falling Stars")  # Sets the title of the game window
+    clock = pygame.time.Clock()                            # Creates a clock to limit how often we draw
+    timestep = FixedTimestep(FPS)                          # Runs the game logic at a steady FPS, even if drawing is slow
+    background = Starfield(BLACK, scroll=not args.dirty)   # Layers of stars that scroll at different speeds (still with --dirty)
+    renderer = Renderer(background, dirty=args.dirty)      # Draws the background and updates the whole screen, or only what changed
+    profiler = FrameProfiler(keep_records=bool(args.profile_out))  # Measures how long each part of a frame takes
+    if args.profile:
+        profiler.toggle_overlay()
+    latency = LatencyProbe()                               # Measures how old the input on screen is
+    if args.low_latency:
+        allow_events(pygame.QUIT, pygame.KEYDOWN)          # Ignore all other events (like mouse movement)
+    startup.mark("display")
+    audio = Audio(enabled=not args.no_sound)        # Loads the sound effects once, so playing one is instant
+    startup.mark("audio")
+
+    ################### Part 2 - Game setup - initialize game variables ###################
+    font = pygame.font.Font(None, 36)               # pygame's built-in font, size 36 (no slow search through the system fonts)
+    small_font = pygame.font.Font(None, 20)         # Smaller font for the names above the paddles
+    startup.mark("fonts")
+    # Work out who is playing: one player on their own, or every member of the chosen teams
+    players = []                      # List of (team name, player name) - one paddle each
+    if args.teams:
+        roster = load_roster()
+        for wanted in args.teams:
+            team = find_team(roster, wanted)
+            if team is None or not roster[team]:
+                print(f"Unknown or empty team: {wanted}")
+                sys.exit(1)
+            players += [(team, member) for member in roster[team]]
+        if len(players) > len(PADDLE_KEYS):
+            print(f"Too many players: {len(players)} paddles, but only {len(PADDLE_KEYS)} key pairs")
+            sys.exit(1)
+    else:
+        players = [("Score", None)]
+    teams = list(dict.fromkeys(team for team, member in players))   # Team names without repeats, in order
+    team_scores = {team: 0 for team in teams}                        # Score for every team (starts at 0)
+    # Creates one paddle per player, spread out along the bottom of the screen
+    paddles = []
+    for i, (team, member) in enumerate(players):
+        x = (i + 1) * WIDTH // (len(players) + 1) - PLAYER_WIDTH // 2
+        rect = pygame.Rect(x, HEIGHT - 50, PLAYER_WIDTH, PLAYER_HEIGHT)
+        left_key, right_key = PADDLE_KEYS[i]
+        label = None
+        if member:                    # Name and keys above the paddle, so everyone can find theirs
+            keys_name = f"{pygame.key.name(left_key)}/{pygame.key.name(right_key)}"
+            label = small_font.render(f"{member} ({keys_name})", True, WHITE)
+        paddles.append({
+            "rect": rect,
+            "prev_x": rect.x,         # Where the paddle was one game step ago (for smooth drawing)
+            "keys": (left_key, right_key),
+            "team": team,
+            "color": PLAYER_COLOR if not member else TEAM_COLORS[teams.index(team) % len(TEAM_COLORS)],
+            "label": label,
+        })
+    missed = 0                        # Count   of missed stars (starts at 0)
+    ticks = 0                         # Game steps so far (levels can change the stars over time)
+    star_fall_speed = level.at(0)[1]  # How fast stars fall down the screen
+    running = True
+
+    ################### Part 3 - Main game loop ###################
+    while running:
+        renderer.begin(screen)                            # Draw the background over the previous frame (the whole screen, or only what was drawn)
+        # Events handling - check for user input like closing the window
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:                  # If user clicks the close button
+                running = False                            # Stop the game loop
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                profiler.toggle_overlay()                  # Show or hide the frame timings
+        profiler.mark("events")
+        # Run as many game steps as the time since the last frame needs (0, 1 or a few)
+        for _ in range(timestep.advance()):
+            # Controls - handle keyboard input for moving every paddle
+            keys = pygame.key.get_pressed()                    # Get the current state of all keyboard keys
+            latency.sample()                                   # The paddles on screen show these keys
+            for paddle in paddles:
+                rect = paddle["rect"]
+                paddle["prev_x"] = rect.x                      # Remember where the paddle was before this step
+                left_key, right_key = paddle["keys"]
+                if keys[left_key] and rect.left > 0:           # If its left key is pressed and it isn't at the left edge
+                    rect.x -= player_speed                     # Move paddle left
+                if keys[right_key] and rect.right < WIDTH:     # If its right key is pressed and it isn't at the right edge
+                    rect.x += player_speed                     # Move paddle right
+            # Look up this step's star chance and speed in the level (it can go up with the score)
+            ticks += 1
+            spawn = level.at(sum(team_scores.values()), ticks)
+            star_chance, star_fall_speed = spawn[0], spawn[1]
+            # Create new stars randomly
+            if random.random() < star_chance:                  # e.g. 0.1 = 10% chance each step to create a star
+                create_star()                                  # Add a new star to the pool
+            profiler.mark("spawn")
+            background.advance()                               # Scroll the background stars one step
+            # Move stars down the screen and put each one in the collision grid
+            grid.clear()
+            for i in range(len(stars)):
+                star = stars[i]
+                star.y += star_fall_speed                      # Move the star downward by adding to its y position
+                grid.insert(i, star)
+            # Each paddle only checks the stars near it; the first paddle to touch a star catches it
+            caught = {}                                        # star index -> team that caught it
+            for paddle in paddles:
+                for i in grid.query(paddle["rect"]):
+                    if i not in caught and stars[i].colliderect(paddle["rect"]):
+                        caught[i] = paddle["team"]
+            # Remove caught and missed stars (backwards, so removing a star is safe)
+            for i in range(len(stars) - 1, -1, -1):
+                if i in caught:                                # If a paddle caught this star
+                    stars.release_at(i)                        # Remove the star from the game (it goes back to the pool)
+                    team_scores[caught[i]] += 1                # Increase that team's score
+                    audio.play("catch")                        # Play the catch sound (it never waits for the sound)
+                elif stars[i].y > HEIGHT:                      # If star goes below the bottom of the screen
+                    stars.release_at(i)                        # Remove the star from the game (it goes back to the pool)
+                    missed += 1                                # Increase missed count
+            profiler.mark("update")
+        # How far we are between the last game step and the next one (0.0 to 1.0)
+        alpha = timestep.alpha
 
-################### Part 3 - Main game loop ###################
-while running:
-    screen.fill(BLACK)                                # Fill the screen with black color (clears previous frame)
-    # Events handling - check for user input like closing the window
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:                  # If user clicks the close button
-            running = False                            # Stop the game loop
-    # Controls - handle keyboard input for moving the player
-    keys = pygame.key.get_pressed()                    # Get the current state of all keyboard keys
-    if keys[pygame.K_LEFT] and player.left > 0:        # If left arrow key is pressed and player isn't at left edge
-        player.x -= player_speed                       # Move player left
-    if keys[pygame.K_RIGHT] and player.right < WIDTH:  # If right arrow key is pressed and player isn't at right edge
-        player.x += player_speed                       # Move player right
-    # Create new stars randomly
-    if random.randint(1, 10) == 1:                     # 10% chance each frame to create a star
-        stars.append(create_star())                    # Add a new star to the list
-    # Move stars down the screen
-    for star in stars[:]:                              # Loop through a copy of the stars list
-        star.y += star_fall_speed                      # Move the star downward by adding to its y position
-        if star.colliderect(player):                   # Check if star touches the player paddle
-            stars.remove(star)                         # Remove the star from the game
-            score += 1                                 # Increase player's score
-        elif star.y > HEIGHT:                          # If star goes below the bottom of the screen
-            stars.remove(star)                         # Remove the star from the game
-            missed += 1                                # Increase missed count
+        ################### Part 4 - Draw everything on the screen ###################
+        if args.low_latency:
+            # Low latency: read the keys again right before drawing and show the paddles where
+            # they are heading, instead of a bit behind (the game steps still use the keys above)
+            keys = pygame.key.get_pressed()
+            latency.sample()
+        # Objects are drawn between their last and current position, so movement looks smooth
+        for paddle in paddles:
+            rect = paddle["rect"]
+            paddle_x = lerp(paddle["prev_x"], rect.x, alpha)   # Paddle position between the last two steps
+            if args.low_latency:
+                left_key, right_key = paddle["keys"]
+                paddle_x = rect.x + (keys[right_key] - keys[left_key]) * player_speed * alpha
+                paddle_x = max(0, min(paddle_x, WIDTH - PLAYER_WIDTH))  # Keep it on the screen
+            renderer.add(pygame.draw.rect(screen, paddle["color"], (paddle_x, rect.y, PLAYER_WIDTH, PLAYER_HEIGHT)))  # Draw paddle
+            if paddle["label"]:
+                renderer.add(screen.blit(paddle["label"], (paddle_x, rect.y - 18)))
+        for star in stars:                                 # Loop through all active stars
+            star_y = star.y - star_fall_speed * (1 - alpha)    # Stars fall at a fixed speed, so step back part of it
+            renderer.add(pygame.draw.rect(screen, STAR_COLOR, (star.x, star_y, STAR_SIZE, STAR_SIZE)))
+        profiler.mark("draw")
+        # Draw every team's score and the missed count
+        text_y = 10
+        for team in teams:
+            score_text = font.render(f"{team}: {team_scores[team]}", True, WHITE)  # Create text image for score
+            renderer.add(screen.blit(score_text, (10, text_y)))                    # Draw score text at the left
+            text_y += 30
+        missed_text = font.render(f"Missed: {missed}", True, WHITE)  # Create text image for missed count
+        renderer.add(screen.blit(missed_text, (10, text_y)))         # Draw missed text below the scores
+        renderer.add_all(profiler.draw(screen, small_font, (WIDTH - 250, 10)))  # Frame timings, if shown
+        profiler.mark("hud")
+        # Update display with everything we've drawn (renderer.add remembers where we drew)
+        renderer.present()
+        latency.presented()
+        startup.report()                                   # Prints how long it took until the first frame was shown
+        profiler.mark("flip")
+        # Limit how often we draw (the game speed itself is kept steady by the timestep)
+        if args.low_latency:
+            clock.tick_busy_loop(RENDER_FPS)               # Waits more precisely, but keeps one CPU core busy
+        else:
+            clock.tick(RENDER_FPS)
+        profiler.mark("tick")
+        profiler.end_frame(stars=len(stars), latency_ms=round(latency.last_ms, 2))
+    # Clean up and exit when game loop ends
+    if args.profile_out:
+        profiler.export(args.profile_out)                  # Save the frame timings
+    if args.low_latency or args.profile:
+        print(latency.summary())                           # How old the input on screen was
+    if args.profile:
+        print(audio.summary())                             # How quickly sounds start
+    pygame.quit()
+    sys.exit()
 
-################### Part 4 - Draw everything on the screen ###################
-    pygame.draw.rect(screen, PLAYER_COLOR, player)     # Draw player paddle on screen
-    for star in stars:                                 # Loop through all stars in the list 
-        pygame.draw.rect(screen, STAR_COLOR, star)
-    # Draw score and missed count text
-    score_text = font.render(f"Score: {score}", True, WHITE)     # Create text image for score
-    missed_text = font.render(f"Missed: {missed}", True, WHITE)  # Create text image for missed count
-    screen.blit(score_text, (10, 10))                            # Draw score text at top-left position
-    screen.blit(missed_text, (10, 40))                           # Draw missed text below score
-    # Update display with everything we've drawn
-    pygame.display.flip()
-    # Maintain consistent game speed
-    clock.tick(FPS)                             # Wait until it's time for next frame, targeting our FPS rate
-# Clean up and exit when game loop ends
-pygame.quit()
-sys.exit()
\ No newline at end of file
+if __name__ == "__main__":
+    main()
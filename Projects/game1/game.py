@@ -1,36 +1,67 @@
-import pygame
-import random
 import sys
 import os
-from pygame.locals import *
 
-# Initialize Pygame
-pygame.init()
-pygame.mixer.init()
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common import startup  # first, so the start-up time includes importing pygame
+
+import pygame
+import random
+import argparse
+from pygame.locals import *
 
-# Setup fullscreen
-info = pygame.display.Info()
-WIDTH, HEIGHT = info.current_w, info.current_h
-screen = pygame.display.set_mode((WIDTH, HEIGHT), FULLSCREEN)
-pygame.display.set_caption("Catch the Falling Stars - Bomb Edition")
+from common.fonts import get_font
+from common.loop import FixedTimestep, lerp
+from common.particles import ParticleSystem
+from common.pool import Pool
+from common.hud import Hud, get_overlay
+from common.render import Renderer
+from common.sprites import get_rect, get_block
+from common.scores import ScoreStore
+from common.teams import load_roster, find_team
+from common.profiler import FrameProfiler
+from common.quality import QualityGovernor
+from common.latency import LatencyProbe, allow_events
+from common.window import open_fullscreen, parse_size
+from common.audio import Audio
+from common.starfield import Starfield
+from common.levels import load_level, LevelError
+
+# Importing this module has no side effects: the window, fonts and score files
+# are only set up when main() runs
 
 # Constants
-FPS = 60
+FPS = 60  # game ticks per second - all speeds and timers count ticks
+RENDER_FPS = 240  # drawing limit, 0 = uncapped
 PLAYER_SIZE = 40  
 STAR_SIZE = 30
 BOMB_SIZE = 40
 PARTICLE_COUNT = 50
+MAX_PARTICLES = 6000
 HIGHSCORE_FILE = "highscore.txt"
-
-# Load high score
-if os.path.exists(HIGHSCORE_FILE):
-    with open(HIGHSCORE_FILE, "r") as f:
-        try:
-            highscore = int(f.read())
-        except:
-            highscore = 0
-else:
-    highscore = 0
+SCORES_LOG = "scores.log"  # every finished game, for the leaderboards
+DEFAULT_LEVEL = "game1"  # levels/game1.json
+COLOR_BG = (0, 0, 20)
+
+# Fonts, created on first use: get_font(*FONT_LARGE)
+FONT_LARGE = ("Arial", 48, True)
+FONT_MEDIUM = ("Arial", 36)
+FONT_SMALL = ("Arial", 24)
+
+# Set up by setup()
+level = None  # spawn rates and speeds
+audio = None
+background = None
+latency = None
+screen = None
+WIDTH, HEIGHT = 0, 0
+scores = None
+highscore = 0
+player = None
+prev_player_pos = (0, 0)
+clock = None
+timestep = None
+renderer = None
+profiler = None
 
 # Power-up states
 shield_active = False
@@ -42,58 +73,97 @@ shield_count = 0
 slow_time_count = 0
 
 # Game objects
-player = pygame.Rect(WIDTH//2, HEIGHT-100, PLAYER_SIZE, PLAYER_SIZE)
-stars = []
-bombs = []
-particles = []
-clock = pygame.time.Clock()
-font_large = pygame.font.SysFont("Arial", 48, bold=True)
-font_medium = pygame.font.SysFont("Arial", 36)
-font_small = pygame.font.SysFont("Arial", 24)
+particles = ParticleSystem(MAX_PARTICLES, [(255, 0, 0), (255, 255, 255)])
+quality = QualityGovernor(adaptive=False)  # scales the effects when frames get slow, see setup()
+hud = Hud()  # caches rendered text, so unchanged labels are not rendered every frame
+
+# A star or bomb. __slots__ keeps each object small and its fields quick to read
+class FallingObject:
+    __slots__ = ("rect", "prev_y", "color", "speed", "kind", "sprite")
+
+    def __init__(self, x, size, color, speed, kind):
+        self.rect = pygame.Rect(x, -size, size, size)
+        self.reset(x, size, color, speed, kind)
+
+    # Re-initialises a pooled object for reuse
+    def reset(self, x, size, color, speed, kind):
+        self.rect.update(x, -size, size, size)
+        self.prev_y = -size
+        self.color = color
+        self.speed = speed
+        self.kind = kind  # "star" or "bomb"
+        self.sprite = get_rect(color, (size, size))
+
+# Falling objects are pooled: removed stars/bombs are reused by later spawns
+stars = Pool(FallingObject, FallingObject.reset)
+bombs = Pool(FallingObject, FallingObject.reset)
 
 # Create falling objects
-def create_star():
+# speed_low / speed_high come from the level's table for the current score
+def create_star(speed_low, speed_high):
     x = random.randint(0, WIDTH - STAR_SIZE)
     color = random.choice([(255, 255, 0), (255, 255, 255)])
-    base_speed = 3 + min(score / 100, 12)
-    return {
-        "rect": pygame.Rect(x, -STAR_SIZE, STAR_SIZE, STAR_SIZE),
-        "color": color,
-        "speed": random.uniform(base_speed, base_speed + 2),
-        "type": "star"
-    }
-
-def create_bomb():
+    return stars.spawn(x, STAR_SIZE, color, random.uniform(speed_low, speed_high), "star")
+
+def create_bomb(speed_low, speed_high):
     x = random.randint(0, WIDTH - BOMB_SIZE)
-    base_speed = 4 + min(score / 80, 16)
-    return {
-        "rect": pygame.Rect(x, -BOMB_SIZE, BOMB_SIZE, BOMB_SIZE),
-        "color": (255, 0, 0),
-        "speed": random.uniform(base_speed, base_speed + 2),
-        "type": "bomb"
-    }
+    return bombs.spawn(x, BOMB_SIZE, (255, 0, 0), random.uniform(speed_low, speed_high), "bomb")
 
 def create_explosion(pos):
-    for _ in range(PARTICLE_COUNT * 3):
-        particles.append({
-            "pos": [pos[0], pos[1]],
-            "color": random.choice([(255, 0, 0), (255, 255, 255)]),
-            "size": random.randint(3, 8),
-            "speed": [random.uniform(-5, 5), random.uniform(-10, 2)],
-            "life": random.randint(20, 40)
-        })
+    particles.emit(pos, quality.particles(PARTICLE_COUNT * 3), vel_x=(-5, 5), vel_y=(-10, 2), radius=(3, 8),
+                   life=quality.life((20, 40)))
+
+# Moves the stars one tick (fall is 0.5 in slow time); returns (caught, missed)
+# Walks backwards so release_at can swap the last object into slot i
+def update_stars(fall):
+    caught = missed_now = 0
+    for i in range(len(stars) - 1, -1, -1):
+        star = stars[i]
+        rect = star.rect
+        star.prev_y = rect.y
+        rect.y += star.speed * fall
+        if rect.colliderect(player):
+            create_explosion(rect.center)
+            stars.release_at(i)
+            caught += 1
+        elif rect.top > HEIGHT:
+            stars.release_at(i)
+            missed_now += 1
+    return caught, missed_now
+
+# Moves the bombs one tick; a shield absorbs one hit. Returns (hit without shield, shield still up)
+def update_bombs(fall, shield):
+    hit = False
+    for i in range(len(bombs) - 1, -1, -1):
+        bomb = bombs[i]
+        rect = bomb.rect
+        bomb.prev_y = rect.y
+        rect.y += bomb.speed * fall
+        if rect.colliderect(player):
+            if not shield:
+                create_explosion(rect.center)
+                bombs.release_at(i)
+                hit = True
+            else:
+                bombs.release_at(i)
+                shield = False
+        elif rect.top > HEIGHT:
+            bombs.release_at(i)
+    return hit, shield
 
 # Game state
 score = 0
 missed = 0
+ticks = 0  # game ticks since the start, for the level's waves
 game_over = False
 running = True
 in_menu = True  # Start in menu state
 
 def reset_game():
-    global score, missed, game_over, shield_active, slow_time_active, shield_count, slow_time_count
+    global score, missed, ticks, game_over, shield_active, slow_time_active, shield_count, slow_time_count
     score = 0
     missed = 0
+    ticks = 0
     game_over = False
     shield_active = False
     slow_time_active = False
@@ -104,11 +174,11 @@ def reset_game():
     particles.clear()
 
 def draw_menu():
-    screen.fill((0, 0, 20))
-    title = font_large.render("Catch the Falling Stars", True, (255, 255, 255))
-    subtitle = font_medium.render("Bomb Edition", True, (255, 0, 0))
-    start = font_medium.render("Press SPACE to Start", True, (255, 255, 255))
-    controls = font_small.render("Controls: Mouse to move, S for Shield, T for Slow Time", True, (200, 200, 200))
+    screen.fill(COLOR_BG)
+    title = hud.text("title", get_font(*FONT_LARGE), "Catch the Falling Stars", (255, 255, 255))
+    subtitle = hud.text("subtitle", get_font(*FONT_MEDIUM), "Bomb Edition", (255, 0, 0))
+    start = hud.text("start", get_font(*FONT_MEDIUM), "Press SPACE to Start", (255, 255, 255))
+    controls = hud.text("controls", get_font(*FONT_SMALL), "Controls: Mouse to move, S for Shield, T for Slow Time", (200, 200, 200))
     
     screen.blit(title, (WIDTH//2 - title.get_width()//2, HEIGHT//2 - 100))
     screen.blit(subtitle, (WIDTH//2 - subtitle.get_width()//2, HEIGHT//2 - 40))
@@ -116,165 +186,284 @@ def draw_menu():
     screen.blit(controls, (WIDTH//2 - controls.get_width()//2, HEIGHT//2 + 100))
     pygame.display.flip()
 
-# Main game loop
-while running:
-    for event in pygame.event.get():
-        if event.type == QUIT or (event.type == KEYDOWN and event.key == K_ESCAPE):
-            running = False
+def parse_args():
+    parser = argparse.ArgumentParser(description="Catch the Falling Stars - Bomb Edition")
+    parser.add_argument("--dirty", action="store_true", help="only redraw the parts of the screen that changed")
+    parser.add_argument("--team", help="team from game0/teams.txt to put the scores under, e.g. \"G9A Team 3\"")
+    parser.add_argument("--player", help="player name shown on the leaderboard")
+    parser.add_argument("--profile", action="store_true", help="show frame timings (F3 toggles them)")
+    parser.add_argument("--profile-out", help="save per-frame timings to this .csv or .json file on exit")
+    parser.add_argument("--full-quality", action="store_true", help="never scale down effects when frames are slow")
+    parser.add_argument("--low-latency", action="store_true", help="draw the player where the mouse is right now")
+    parser.add_argument("--resolution", type=parse_size, metavar="WxH",
+                        help="draw at this size (e.g. 1280x720) and scale it to the screen")
+    parser.add_argument("--no-sound", action="store_true", help="play no sound effects or music")
+    parser.add_argument("--level", default=DEFAULT_LEVEL,
+                        help="level file, or the name of one in Projects/levels (default: %(default)s)")
+    args = parser.parse_args()
+    if args.team:
+        team = find_team(load_roster(), args.team)
+        if team is None:
+            print(f"Unknown team: {args.team}")
+            sys.exit(1)
+        args.team = team
+    try:
+        args.level = load_level(args.level)
+    except LevelError as e:
+        print(f"Bad level: {e}")
+        sys.exit(1)
+    return args
+
+# Opens the window and loads everything the game loop needs
+def setup(args):
+    global screen, WIDTH, HEIGHT, scores, highscore, player, prev_player_pos
+    global clock, timestep, renderer, profiler, quality, latency, audio, background, level
+
+    # Only the parts of pygame the game uses; Audio opens the mixer with a small buffer itself
+    pygame.display.init()
+    pygame.font.init()
+
+    # Setup fullscreen, at the monitor's resolution or at --resolution scaled up to it
+    screen = open_fullscreen(args.resolution)
+    WIDTH, HEIGHT = screen.get_size()
+    pygame.display.set_caption("Catch the Falling Stars - Bomb Edition")
+    startup.mark("display")
+    audio = Audio(enabled=not args.no_sound)  # every effect is loaded now, so playing one never waits
+    audio.play_music()
+    startup.mark("audio")
+
+    # Load high score (saving happens on a background thread)
+    scores = ScoreStore(HIGHSCORE_FILE, SCORES_LOG)
+    highscore = scores.highscore
+
+    player = pygame.Rect(WIDTH//2, HEIGHT-100, PLAYER_SIZE, PLAYER_SIZE)
+    prev_player_pos = player.topleft
+    clock = pygame.time.Clock()
+    timestep = FixedTimestep(FPS)
+    # Scrolling stars behind the game; dirty-rectangle mode needs a still background
+    background = Starfield(COLOR_BG, scroll=not args.dirty)
+    renderer = Renderer(background, dirty=args.dirty)  # with --dirty only changed areas are redrawn
+    profiler = FrameProfiler(keep_records=bool(args.profile_out))  # times each part of the frame
+    if args.profile:
+        profiler.toggle_overlay()
+    quality = QualityGovernor(adaptive=not args.full_quality)
+    latency = LatencyProbe()  # how old the mouse position on screen is
+    if args.low_latency:
+        allow_events(QUIT, KEYDOWN)  # the game only reacts to these
+    level = args.level
+    startup.mark("setup")
+    for font in (FONT_LARGE, FONT_MEDIUM, FONT_SMALL):
+        get_font(*font)
+    startup.mark("fonts")
+
+def main():
+    global running, in_menu, score, missed, ticks, game_over, highscore, prev_player_pos
+    global shield_active, shield_count, slow_time_active, slow_time_duration, slow_time_count
+
+    args = parse_args()
+    startup.mark("imports")
+    setup(args)
+
+    # Main game loop
+    while running:
+        quality.begin()
+        for event in pygame.event.get():
+            if event.type == QUIT or (event.type == KEYDOWN and event.key == K_ESCAPE):
+                running = False
         
-        if in_menu and event.type == KEYDOWN and event.key == K_SPACE:
-            in_menu = False
-            reset_game()
-            
-        if game_over and event.type == KEYDOWN:
-            if event.key == K_r:
+            if in_menu and event.type == KEYDOWN and event.key == K_SPACE:
+                in_menu = False
                 reset_game()
-            if event.key == K_m:
-                in_menu = True
-
-        # Activate shield (S key)
-        if not in_menu and event.type == KEYDOWN and event.key == K_s:
-            if shield_count > 0 and not shield_active:
-                shield_active = True
-                shield_count -= 1
-
-        # Activate slow time (T key)
-        if not in_menu and event.type == KEYDOWN and event.key == K_t:
-            if slow_time_count > 0 and not slow_time_active:
-                slow_time_active = True
-                slow_time_duration = 180
-                slow_time_count -= 1
-
-    if in_menu:
-        draw_menu()
-        clock.tick(FPS)
-        continue
-
-    if not game_over:
-        # Gameplay logic
-        mouse_x, mouse_y = pygame.mouse.get_pos()
-        player.center = (mouse_x, mouse_y)
-
-        # Keep player on screen
-        player.left = max(0, player.left)
-        player.right = min(WIDTH, player.right)
-        player.top = max(0, player.top)
-        player.bottom = min(HEIGHT, player.bottom)
-
-        # Spawn stars and bombs
-        star_spawn_chance = 0.03 + min(score / 2000, 0.07)
-        bomb_spawn_chance = 0.005 + min(score / 4000, 0.02)
-
-        if random.random() < star_spawn_chance:
-            stars.append(create_star())
-            # 10% chance to get a power-up when a star spawns
-            if random.random() < 0.1:
-                if random.choice([True, False]):
-                    shield_count += 1
-                else:
-                    slow_time_count += 1
-
-        if random.random() < bomb_spawn_chance:
-            bombs.append(create_bomb())
-
-        # Update stars
-        for star in stars[:]:
-            star["rect"].y += star["speed"] * (0.5 if slow_time_active else 1.0)
-            if star["rect"].colliderect(player):
-                create_explosion(star["rect"].center)
-                stars.remove(star)
-                score += 10
-            elif star["rect"].top > HEIGHT:
-                stars.remove(star)
-                missed += 1
-
-        # Update bombs
-        for bomb in bombs[:]:
-            bomb["rect"].y += bomb["speed"] * (0.5 if slow_time_active else 1.0)
-            if bomb["rect"].colliderect(player):
-                if not shield_active:
-                    create_explosion(bomb["rect"].center)
-                    bombs.remove(bomb)
-                    game_over = True
-                else:
-                    bombs.remove(bomb)
-                    shield_active = False
-            elif bomb["rect"].top > HEIGHT:
-                bombs.remove(bomb)
-
-        # Update slow time
-        if slow_time_active:
-            slow_time_duration -= 1
-            if slow_time_duration <= 0:
-                slow_time_active = False
-
-    # Update particles
-    for particle in particles[:]:
-        particle["pos"][0] += particle["speed"][0]
-        particle["pos"][1] += particle["speed"][1]
-        particle["life"] -= 1
-        if particle["life"] <= 0:
-            particles.remove(particle)
-
-    # Drawing
-    screen.fill((0, 0, 20))  # Dark background
-
-    # Draw particles
-    for particle in particles:
-        pygame.draw.circle(screen, particle["color"], 
-                          [int(particle["pos"][0]), int(particle["pos"][1])], 
-                          particle["size"])
-
-    # Draw stars and bombs
-    for star in stars:
-        pygame.draw.rect(screen, star["color"], star["rect"])
-    for bomb in bombs:
-        pygame.draw.rect(screen, bomb["color"], bomb["rect"])
-
-    # Draw player if not in menu or game over
-    if not game_over:
-        pygame.draw.rect(screen, (0, 255, 255), player, border_radius=5)
-
-    # Draw UI
-    score_text = font_medium.render(f"Score: {score}", True, (255, 255, 255))
-    screen.blit(score_text, (20, 20))
-
-    highscore_text = font_small.render(f"High Score: {highscore}", True, (255, 255, 255))
-    screen.blit(highscore_text, (20, 60))
-
-    # Draw power-up indicators
-    shield_icon = font_small.render(f"Shields: {shield_count}", True, (0, 255, 0))
-    slow_icon = font_small.render(f"Slow Time: {slow_time_count}", True, (255, 255, 0))
-    screen.blit(shield_icon, (20, 100))
-    screen.blit(slow_icon, (20, 130))
-
-    if shield_active:
-        active_text = font_small.render("SHIELD ACTIVE!", True, (0, 255, 0))
-        screen.blit(active_text, (WIDTH//2 - active_text.get_width()//2, 20))
-
-    if slow_time_active:
-        active_text = font_small.render("SLOW TIME ACTIVE!", True, (255, 255, 0))
-        screen.blit(active_text, (WIDTH//2 - active_text.get_width()//2, 50))
-
-    if game_over:
-        overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 180))
-        screen.blit(overlay, (0, 0))
-        game_over_text = font_large.render("GAME OVER!", True, (255, 0, 0))
-        final_score = font_medium.render(f"Final Score: {score}", True, (255, 255, 255))
-        restart = font_small.render("Press R to restart or M for menu", True, (255, 255, 255))
-        screen.blit(game_over_text, (WIDTH//2 - game_over_text.get_width()//2, HEIGHT//2 - 60))
-        screen.blit(final_score, (WIDTH//2 - final_score.get_width()//2, HEIGHT//2))
-        screen.blit(restart, (WIDTH//2 - restart.get_width()//2, HEIGHT//2 + 60))
-
-    pygame.display.flip()
-    clock.tick(FPS)
-
-    # Update high score
-    if score > highscore:
-        highscore = score
-        with open(HIGHSCORE_FILE, "w") as f:
-            f.write(str(highscore))
+            
+            if game_over and event.type == KEYDOWN:
+                if event.key == K_r:
+                    reset_game()
+                if event.key == K_m:
+                    in_menu = True
+
+            # Activate shield (S key)
+            if not in_menu and event.type == KEYDOWN and event.key == K_s:
+                if shield_count > 0 and not shield_active:
+                    shield_active = True
+                    shield_count -= 1
+                    audio.play("shield")
+
+            # Activate slow time (T key)
+            if not in_menu and event.type == KEYDOWN and event.key == K_t:
+                if slow_time_count > 0 and not slow_time_active:
+                    slow_time_active = True
+                    slow_time_duration = 180
+                    slow_time_count -= 1
+                    audio.play("slow_time")
+
+            if event.type == KEYDOWN and event.key == K_F3:
+                profiler.toggle_overlay()
+        profiler.mark("events")
+
+        if in_menu:
+            draw_menu()
+            startup.report()
+            clock.tick(FPS)
+            timestep.reset()
+            renderer.invalidate()  # the menu drew over everything
+            profiler.skip_frame()
+            continue
+
+        # Run the game logic in fixed ticks, however long the last frame took
+        for _ in range(timestep.advance()):
+            if not game_over:
+                # Gameplay logic
+                prev_player_pos = player.topleft
+                mouse_x, mouse_y = pygame.mouse.get_pos()
+                latency.sample()
+                player.center = (mouse_x, mouse_y)
+
+                # Keep player on screen
+                player.left = max(0, player.left)
+                player.right = min(WIDTH, player.right)
+                player.top = max(0, player.top)
+                player.bottom = min(HEIGHT, player.bottom)
+
+                # Spawn stars and bombs, with the chances and speeds the level has for this score
+                ticks += 1
+                star_chance, star_low, star_high, bomb_chance, bomb_low, bomb_high, power_up = \
+                    level.at(score, ticks)
+
+                if random.random() < star_chance:
+                    create_star(star_low, star_high)
+                    # Chance to get a power-up when a star spawns (10% in the default level)
+                    if random.random() < power_up:
+                        if random.choice([True, False]):
+                            shield_count += 1
+                        else:
+                            slow_time_count += 1
+
+                if random.random() < bomb_chance:
+                    create_bomb(bomb_low, bomb_high)
+                profiler.mark("spawn")
+
+                # Update stars and bombs
+                fall = 0.5 if slow_time_active else 1.0
+                caught, missed_now = update_stars(fall)
+                score += 10 * caught
+                missed += missed_now
+                if caught:
+                    audio.play("catch")
+                had_shield = shield_active
+                game_over, shield_active = update_bombs(fall, shield_active)
+                background.advance(fall)
+                if had_shield and not shield_active:  # the shield took a bomb
+                    audio.play("explosion")
+                if game_over:  # this game just ended
+                    audio.play("explosion")
+                    audio.play("game_over")
+                    scores.add_result(score, args.team, args.player)
+
+                # Update slow time
+                if slow_time_active:
+                    slow_time_duration -= 1
+                    if slow_time_duration <= 0:
+                        slow_time_active = False
+                profiler.mark("update")
+
+            # Update particles
+            particles.update()
+            profiler.mark("particles")
+
+        # Fraction of a tick since the last update, used to draw between positions
+        alpha = timestep.alpha
+        # Frozen objects (game over) are drawn where they are
+        object_alpha = 1.0 if game_over else alpha
+
+        # Drawing
+        renderer.begin(screen)  # Dark starfield background
+
+        # Draw particles
+        renderer.add_all(particles.draw(screen, alpha))
+
+        # Draw stars and bombs as pre-rendered sprites, all in one blits() call
+        batch = []
+        simple = quality.simple_sprites  # opaque blocks, cheaper to blit than alpha sprites
+        for obj in stars.active + bombs.active:
+            rect = obj.rect
+            sprite = get_block(obj.color, rect.size) if simple else obj.sprite
+            batch.append((sprite, (rect.x, lerp(obj.prev_y, rect.y, object_alpha))))
+        renderer.add_all(screen.blits(batch))
+
+        # Draw player if not in menu or game over
+        if not game_over:
+            player_draw = player.copy()
+            player_draw.topleft = (lerp(prev_player_pos[0], player.x, alpha), lerp(prev_player_pos[1], player.y, alpha))
+            if args.low_latency:
+                # Where the mouse is now rather than at the last tick; collisions still use the tick's position
+                player_draw.center = pygame.mouse.get_pos()
+                player_draw.clamp_ip(screen.get_rect())
+                latency.sample()
+            renderer.add(pygame.draw.rect(screen, (0, 255, 255), player_draw, border_radius=5))
+        profiler.mark("draw")
+
+        # Draw UI
+        score_text = hud.text("score_text", get_font(*FONT_MEDIUM), f"Score: {score}", (255, 255, 255))
+        renderer.add(screen.blit(score_text, (20, 20)))
+
+        highscore_text = hud.text("highscore_text", get_font(*FONT_SMALL), f"High Score: {highscore}", (255, 255, 255))
+        renderer.add(screen.blit(highscore_text, (20, 60)))
+
+        # Draw power-up indicators
+        shield_icon = hud.text("shield_icon", get_font(*FONT_SMALL), f"Shields: {shield_count}", (0, 255, 0))
+        slow_icon = hud.text("slow_icon", get_font(*FONT_SMALL), f"Slow Time: {slow_time_count}", (255, 255, 0))
+        renderer.add(screen.blit(shield_icon, (20, 100)))
+        renderer.add(screen.blit(slow_icon, (20, 130)))
+
+        if shield_active:
+            active_text = hud.text("shield_active", get_font(*FONT_SMALL), "SHIELD ACTIVE!", (0, 255, 0))
+            renderer.add(screen.blit(active_text, (WIDTH//2 - active_text.get_width()//2, 20)))
 
-pygame.quit()
-sys.exit()
\ No newline at end of file
+        if slow_time_active:
+            active_text = hud.text("slow_time_active", get_font(*FONT_SMALL), "SLOW TIME ACTIVE!", (255, 255, 0))
+            renderer.add(screen.blit(active_text, (WIDTH//2 - active_text.get_width()//2, 50)))
+
+        if game_over:
+            if quality.overlays:
+                renderer.add(screen.blit(get_overlay((WIDTH, HEIGHT), (0, 0, 0, 180)), (0, 0)))
+            game_over_text = hud.text("game_over_text", get_font(*FONT_LARGE), "GAME OVER!", (255, 0, 0))
+            final_score = hud.text("final_score", get_font(*FONT_MEDIUM), f"Final Score: {score}", (255, 255, 255))
+            restart = hud.text("restart", get_font(*FONT_SMALL), "Press R to restart or M for menu", (255, 255, 255))
+            renderer.add(screen.blit(game_over_text, (WIDTH//2 - game_over_text.get_width()//2, HEIGHT//2 - 60)))
+            renderer.add(screen.blit(final_score, (WIDTH//2 - final_score.get_width()//2, HEIGHT//2)))
+            renderer.add(screen.blit(restart, (WIDTH//2 - restart.get_width()//2, HEIGHT//2 + 60)))
+
+        # Frame timings (F3)
+        renderer.add_all(profiler.draw(screen, get_font(*FONT_SMALL), (WIDTH - 360, 20)))
+        profiler.mark("hud")
+
+        renderer.present()
+        latency.presented()
+        startup.report()
+        profiler.mark("flip")
+        quality.end()  # the work of this frame, without the wait below
+        if args.low_latency:
+            clock.tick_busy_loop(RENDER_FPS)  # wakes up on time, at the cost of a busy CPU core
+        else:
+            clock.tick(RENDER_FPS)
+        profiler.mark("tick")
+        profiler.end_frame(stars=len(stars), bombs=len(bombs), particles=len(particles), quality=quality.level,
+                           latency_ms=round(latency.last_ms, 2))
+
+        # Update high score
+        if score > highscore:
+            highscore = score
+            scores.set_highscore(highscore)
+
+    if args.profile_out:
+        profiler.export(args.profile_out)
+    if args.low_latency or args.profile:
+        print(latency.summary())
+    if args.profile:
+        print(audio.summary())
+    scores.close()
+    pygame.quit()
+    sys.exit()
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,39 @@
-import pygame
-import random
 import sys
 import os
 
-pygame.init()
-
-# Screen setup (fullscreen)
-info = pygame.display.Info()
-WIDTH, HEIGHT = info.current_w, info.current_h
-screen = pygame.display.set_mode((WIDTH, HEIGHT), pygame.FULLSCREEN)
-pygame.display.set_caption("Catch the Falling Stars - Bomb Edition")
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common import startup  # first, so the start-up time includes importing pygame
 
-clock = pygame.time.Clock()
-FPS = 60
+import pygame
+import random
+import argparse
+import math
+import struct
+
+from common.fonts import get_font
+from common.loop import FixedTimestep, lerp
+from common.particles import ParticleSystem
+from common.pool import Pool
+from common.hud import Hud, get_overlay
+from common.render import Renderer
+from common.sprites import get_rect, get_sprite, get_block
+from common.scores import ScoreStore
+from common.teams import load_roster, find_team
+from common.profiler import FrameProfiler
+from common.quality import QualityGovernor
+from common.latency import LatencyProbe, allow_events
+from common.window import open_fullscreen, parse_size
+from common.replay import Recording, TickInput
+from common.audio import Audio
+from common.starfield import Starfield
+from common.levels import load_level, LevelError
+from common.rewind import SnapshotRing, SnapshotWriter, load_snapshot
+
+# Importing this module has no side effects: pygame, the window and the fonts
+# are only set up in main() or on first use, so headless.py, replay.py and the
+# benchmark can import the game logic cheaply
+FPS = 60  # simulation ticks per second; speeds and timers are per tick
+RENDER_FPS = 240  # drawing limit, 0 = uncapped
 
 # Colors
 COLOR_BG = (5, 5, 25)
@@ -30,103 +51,150 @@ PLAYER_SIZE = 50
 STAR_SIZE = 30
 BOMB_SIZE = 40
 PARTICLE_COUNT = 40
+MAX_PARTICLES = 4000
+PARTICLE_GRAVITY = 0.3
+PARTICLE_SHRINK = 0.15
+FUSE_HEIGHT = 14
+
+# Player actions, collected from key presses and applied at the start of a tick
+ACTION_SHIELD = 1
+ACTION_SLOW_TIME = 2
+ACTION_RESTART = 4
+ACTION_PAUSE = 8
+ACTION_REWIND = 16
 HIGHSCORE_FILE = "highscore.txt"
-
-# Fonts
-font_large = pygame.font.SysFont("Arial", 64, bold=True)
-font_medium = pygame.font.SysFont("Arial", 36)
-font_small = pygame.font.SysFont("Arial", 24)
-
-# Load highscore
-def load_highscore():
-    if os.path.exists(HIGHSCORE_FILE):
-        try:
-            with open(HIGHSCORE_FILE, "r") as f:
-                return int(f.read())
-        except:
-            return 0
-    else:
-        return 0
-
-def save_highscore(score):
-    try:
-        with open(HIGHSCORE_FILE, "w") as f:
-            f.write(str(score))
-    except:
-        pass
-
-highscore = load_highscore()
+SCORES_LOG = "scores.log"  # every finished game, for the leaderboards
+DEFAULT_LEVEL = "game2"  # levels/game2.json
+RESUME_FILE = "resume.snap"  # the running game, saved every RESUME_EVERY ticks for --resume
+RESUME_EVERY = FPS * 5
+REWIND_SECONDS = 3  # how far one press of the rewind key goes back
+SPAWN_DRAWS = 9  # values spawn_paired() takes from spawn_rng every tick
+
+# Game.snapshot() layout: the fields below, the random module's state, one
+# FALLING record per star and then per bomb, and the particles' own state
+SNAPSHOT_VERSION = 1
+SNAPSHOT = struct.Struct("<HHHiiiiBiBBiiiiiBiHH")
+RANDOM_STATE = struct.Struct("<625Id")  # Mersenne Twister words and position, gauss_next (NaN if none)
+FALLING = struct.Struct("<iiiHdB")  # x, y, prev_y, size, speed, white star
+
+# Fonts, created on first use: get_font(*FONT_LARGE)
+FONT_LARGE = ("Arial", 64, True)
+FONT_MEDIUM = ("Arial", 36)
+FONT_SMALL = ("Arial", 24)
+hud = Hud()  # re-renders a text widget only when its value changes
+
+# Size of the monitor, for the fullscreen window
+def screen_size():
+    pygame.display.init()
+    info = pygame.display.Info()
+    return info.current_w, info.current_h
+
+# The bomb and its fuse as one sprite; the fuse sticks out FUSE_HEIGHT above the bomb's rect
+def make_bomb_sprite(size):
+    surface = pygame.Surface((size, size + FUSE_HEIGHT), pygame.SRCALPHA)
+    pygame.draw.circle(surface, COLOR_BOMB, (size // 2, FUSE_HEIGHT + size // 2), size // 2)
+    pygame.draw.rect(surface, (255, 215, 0), (size // 2 - 3, 0, 6, FUSE_HEIGHT))
+    return surface
 
 # Classes
-class Particle:
-    def __init__(self, pos):
-        self.pos = [pos[0], pos[1]]
-        self.radius = random.randint(4, 7)
-        self.color = random.choice([COLOR_PARTICLE_RED, COLOR_PARTICLE_WHITE])
-        self.vel = [random.uniform(-4, 4), random.uniform(-8, -2)]
-        self.life = random.randint(20, 40)
-
-    def update(self):
-        self.vel[1] += 0.3  # gravity
-        self.pos[0] += self.vel[0]
-        self.pos[1] += self.vel[1]
-        self.life -= 1
-        self.radius = max(0, self.radius - 0.15)
-
-    def draw(self, surf):
-        if self.radius > 0:
-            pygame.draw.circle(surf, self.color, (int(self.pos[0]), int(self.pos[1])), int(self.radius))
-
 class FallingObject:
-    def __init__(self, x, y, size, speed, kind):
+    def __init__(self, x, y, size, speed, kind, color=None):
         self.rect = pygame.Rect(x, y, size, size)
+        self.reset(x, y, size, speed, kind, color)
+
+    # Re-initialises a pooled object for reuse. Stars pick a random colour
+    # unless one is given (restoring a snapshot must not draw random numbers)
+    def reset(self, x, y, size, speed, kind, color=None):
+        self.rect.update(x, y, size, size)
+        self.prev_y = y
         self.speed = speed
         self.kind = kind  # "star" or "bomb"
-        self.color = COLOR_STAR_YELLOW if kind == "star" else COLOR_BOMB
-        if kind == "star" and random.random() < 0.5:
-            self.color = COLOR_STAR_WHITE
+        if color is None:
+            color = COLOR_STAR_YELLOW if kind == "star" else COLOR_BOMB
+            if kind == "star" and random.random() < 0.5:
+                color = COLOR_STAR_WHITE
+        self.color = color
+        # Pre-rendered look, drawn at (rect.x, y + sprite_dy)
+        if kind == "star":
+            self.sprite = get_rect(self.color, (size, size), border_radius=6)
+            self.sprite_dy = 0
+        else:
+            self.sprite = get_sprite(("bomb", size), lambda: make_bomb_sprite(size))
+            self.sprite_dy = -FUSE_HEIGHT
 
     def update(self, slow_time):
+        self.prev_y = self.rect.y
         self.rect.y += self.speed * (0.5 if slow_time else 1)
 
-    def draw(self, surf):
-        if self.kind == "star":
-            pygame.draw.rect(surf, self.color, self.rect, border_radius=6)
-        else:
-            center = self.rect.center
-            pygame.draw.circle(surf, COLOR_BOMB, center, self.rect.width // 2)
-            # bomb fuse
-            fuse_rect = pygame.Rect(0, 0, 6, 14)
-            fuse_rect.center = (center[0], center[1] - self.rect.width // 2 - 7)
-            pygame.draw.rect(surf, (255, 215, 0), fuse_rect)
+    # Returns the area that was drawn (Game.draw blits all objects in one batch instead)
+    def draw(self, surf, alpha=1.0):
+        return surf.blit(self.sprite, (self.rect.x, lerp(self.prev_y, self.rect.y, alpha) + self.sprite_dy))
 
 class Player:
-    def __init__(self):
-        self.rect = pygame.Rect(WIDTH // 2, HEIGHT - 150, PLAYER_SIZE, PLAYER_SIZE)
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.rect = pygame.Rect(bounds.width // 2, bounds.height - 150, PLAYER_SIZE, PLAYER_SIZE)
+        self.prev_pos = self.rect.topleft
         self.shield_active = False
         self.shield_timer = 0
 
     def update(self, pos):
+        self.prev_pos = self.rect.topleft
         self.rect.center = pos
         # Keep inside screen
-        self.rect.clamp_ip(screen.get_rect())
+        self.rect.clamp_ip(self.bounds)
         if self.shield_active:
             self.shield_timer -= 1
             if self.shield_timer <= 0:
                 self.shield_active = False
 
-    def draw(self, surf):
+    # Returns the area that was drawn. pointer, if given, is a newer mouse
+    # position to draw the player at (low-latency mode; gameplay still uses rect)
+    def draw(self, surf, alpha=1.0, pointer=None):
+        rect = self.rect.copy()
+        if pointer is not None:
+            rect.center = pointer
+            rect.clamp_ip(self.bounds)
+        else:
+            rect.topleft = (lerp(self.prev_pos[0], self.rect.x, alpha), lerp(self.prev_pos[1], self.rect.y, alpha))
         color = COLOR_SHIELD if self.shield_active else COLOR_PLAYER
-        pygame.draw.rect(surf, color, self.rect, border_radius=10)
+        drawn = pygame.draw.rect(surf, color, rect, border_radius=10)
         if self.shield_active:
-            pygame.draw.rect(surf, (0, 255, 100), self.rect.inflate(12, 12), 4, border_radius=16)
+            drawn = drawn.union(pygame.draw.rect(surf, (0, 255, 100), rect.inflate(12, 12), 4, border_radius=16))
+        return drawn
 
 class Game:
-    def __init__(self):
-        self.player = Player()
-        self.stars = []
-        self.bombs = []
-        self.particles = []
+    # input_source is anything with a get_pos() method (pygame.mouse by default).
+    # scores is the ScoreStore results are saved to (None for simulated games);
+    # team and player say whose leaderboard they go on. profiler times the
+    # phases of update() and draw() (see common/profiler.py); quality scales
+    # the effects (see common/quality.py, full quality by default). The size
+    # defaults to the monitor's. With rewind=True a snapshot of the last few
+    # seconds is kept so ACTION_REWIND can go back in time. spawn_rng (a
+    # random.Random) makes spawns use a fixed number of its values per tick,
+    # see spawn_paired().
+    def __init__(self, width=None, height=None, input_source=None, scores=None, team=None, player=None,
+                 profiler=None, quality=None, audio=None, level=None, rewind=False, spawn_rng=None):
+        if width is None or height is None:
+            width, height = screen_size()
+        self.width = width
+        self.height = height
+        self.input_source = input_source or pygame.mouse
+        self.scores = scores
+        self.team = team
+        self.player_name = player
+        self.profiler = profiler or FrameProfiler()
+        self.quality = quality or QualityGovernor(adaptive=False)
+        self.audio = audio or Audio(enabled=False)
+        self.level = level or load_level(DEFAULT_LEVEL)  # spawn rates and speeds, see levels/game2.json
+        self.spawn_rng = spawn_rng
+        self.player = Player(pygame.Rect(0, 0, width, height))
+        self.stars = Pool(FallingObject, FallingObject.reset)
+        self.bombs = Pool(FallingObject, FallingObject.reset)
+        # Seeded from the game's random stream, so one random.seed() replays everything
+        self.particles = ParticleSystem(MAX_PARTICLES, [COLOR_PARTICLE_RED, COLOR_PARTICLE_WHITE],
+                                        gravity=PARTICLE_GRAVITY, shrink=PARTICLE_SHRINK,
+                                        seed=random.getrandbits(32))
         self.score = 0
         self.missed = 0
         self.shield_count = 0
@@ -135,87 +203,196 @@ class Game:
         self.slow_time_timer = 0
         self.game_over = False
         self.paused = False
-        self.highscore = highscore
+        self.highscore = scores.highscore if scores else 0
         self.spawn_timer = 0
+        self.rewind_ring = SnapshotRing() if rewind else None
+        self.practice = False  # rewound: the result no longer goes on the leaderboard
 
     def reset(self):
-        self.__init__()
+        self.__init__(self.width, self.height, self.input_source, self.scores, self.team, self.player_name,
+                      self.profiler, self.quality, self.audio, self.level, self.rewind_ring is not None,
+                      self.spawn_rng)
+
+    # The whole game state as bytes (a few KB): restore() brings it back exactly,
+    # including the random streams, so the game goes on as if nothing happened
+    def snapshot(self):
+        player = self.player
+        _, words, gauss_next = random.getstate()
+        parts = [
+            SNAPSHOT.pack(SNAPSHOT_VERSION, self.width, self.height, self.score, self.missed, self.shield_count,
+                          self.slow_time_count, self.slow_time_active, self.slow_time_timer, self.game_over,
+                          self.paused, self.spawn_timer, player.rect.x, player.rect.y, *player.prev_pos,
+                          player.shield_active, player.shield_timer, len(self.stars), len(self.bombs)),
+            RANDOM_STATE.pack(*words, math.nan if gauss_next is None else gauss_next),
+        ]
+        pack = FALLING.pack
+        parts += [pack(obj.rect.x, obj.rect.y, obj.prev_y, obj.rect.width, obj.speed, obj.color == COLOR_STAR_WHITE)
+                  for obj in self.stars.active + self.bombs.active]
+        parts.append(self.particles.get_state())
+        return b"".join(parts)
+
+    def restore(self, data):
+        fields = SNAPSHOT.unpack_from(data)
+        if fields[0] != SNAPSHOT_VERSION or fields[1:3] != (self.width, self.height):
+            raise ValueError("the snapshot is from another version of the game or another screen size")
+        player = self.player
+        (self.score, self.missed, self.shield_count, self.slow_time_count, slow_time_active, self.slow_time_timer,
+         game_over, paused, self.spawn_timer, x, y, prev_x, prev_y, shield_active, player.shield_timer,
+         star_count, bomb_count) = fields[3:]
+        self.slow_time_active = bool(slow_time_active)
+        self.game_over = bool(game_over)
+        self.paused = bool(paused)
+        player.rect.topleft = (x, y)
+        player.prev_pos = (prev_x, prev_y)
+        player.shield_active = bool(shield_active)
+        self.highscore = max(self.highscore, self.score)
+
+        offset = SNAPSHOT.size
+        state = RANDOM_STATE.unpack_from(data, offset)
+        offset += RANDOM_STATE.size
+        objects = FALLING.iter_unpack(data[offset:offset + (star_count + bomb_count) * FALLING.size])
+        offset += (star_count + bomb_count) * FALLING.size
+        for pool, count, kind in ((self.stars, star_count, "star"), (self.bombs, bomb_count, "bomb")):
+            pool.clear()
+            for _ in range(count):
+                x, y, prev_y, size, speed, white = next(objects)
+                color = COLOR_BOMB if kind == "bomb" else COLOR_STAR_WHITE if white else COLOR_STAR_YELLOW
+                pool.spawn(x, y, size, speed, kind, color).prev_y = prev_y
+        self.particles.set_state(data[offset:])
+        random.setstate((3, state[:625], None if math.isnan(state[625]) else state[625]))
+
+    # Goes back REWIND_SECONDS (or as far as the snapshots go); False if there is nothing to go back to
+    def rewind(self):
+        if self.rewind_ring is None:
+            return False
+        data = self.rewind_ring.back(self.spawn_timer, REWIND_SECONDS * FPS)
+        if data is None:
+            return False
+        self.restore(data)
+        self.practice = True
+        return True
 
     def spawn_objects(self):
         self.spawn_timer += 1
-        star_chance = 0.03 + min(self.score / 1500, 0.06)
-        bomb_chance = 0.007 + min(self.score / 3000, 0.03)
+        # One row of the level's precomputed table for this score and time
+        row = self.level.at(self.score, self.spawn_timer)
+        if self.spawn_rng is not None:
+            self.spawn_paired(row)
+            return
+        star_chance, star_low, star_high, bomb_chance, bomb_low, bomb_high, power_up = row
         if random.random() < star_chance:
-            x = random.randint(0, WIDTH - STAR_SIZE)
-            speed = random.uniform(3 + min(self.score / 100, 12), 5 + min(self.score / 80, 14))
-            self.stars.append(FallingObject(x, -STAR_SIZE, STAR_SIZE, speed, "star"))
-            # 10% chance power-up spawn with star
-            if random.random() < 0.1:
+            x = random.randint(0, self.width - STAR_SIZE)
+            speed = random.uniform(star_low, star_high)
+            self.stars.spawn(x, -STAR_SIZE, STAR_SIZE, speed, "star")
+            # Power-up spawn with the star (10% in the default level)
+            if random.random() < power_up:
                 if random.choice([True, False]):
                     self.shield_count += 1
                 else:
                     self.slow_time_count += 1
         if random.random() < bomb_chance:
-            x = random.randint(0, WIDTH - BOMB_SIZE)
-            speed = random.uniform(4 + min(self.score / 80, 16), 6 + min(self.score / 60, 18))
-            self.bombs.append(FallingObject(x, -BOMB_SIZE, BOMB_SIZE, speed, "bomb"))
+            x = random.randint(0, self.width - BOMB_SIZE)
+            speed = random.uniform(bomb_low, bomb_high)
+            self.bombs.spawn(x, -BOMB_SIZE, BOMB_SIZE, speed, "bomb")
+
+    # Spawns from spawn_rng, which gives exactly SPAWN_DRAWS values every tick
+    # whether or not anything spawns. Games with equal seeds then get the same
+    # numbers on every tick however differently they are played (common random
+    # numbers): the same stars and bombs fall at the same places, and a game
+    # whose score has raised the spawn chances sees those plus a few more.
+    def spawn_paired(self, row):
+        star_chance, star_low, star_high, bomb_chance, bomb_low, bomb_high, power_up = row
+        star, star_x, star_speed, white, power, shield, bomb, bomb_x, bomb_speed = \
+            [self.spawn_rng.random() for _ in range(SPAWN_DRAWS)]
+        if star < star_chance:
+            color = COLOR_STAR_WHITE if white < 0.5 else COLOR_STAR_YELLOW
+            x = int(star_x * (self.width - STAR_SIZE + 1))
+            speed = star_low + star_speed * (star_high - star_low)
+            self.stars.spawn(x, -STAR_SIZE, STAR_SIZE, speed, "star", color)
+            if power < power_up:
+                if shield < 0.5:
+                    self.shield_count += 1
+                else:
+                    self.slow_time_count += 1
+        if bomb < bomb_chance:
+            x = int(bomb_x * (self.width - BOMB_SIZE + 1))
+            speed = bomb_low + bomb_speed * (bomb_high - bomb_low)
+            self.bombs.spawn(x, -BOMB_SIZE, BOMB_SIZE, speed, "bomb")
 
     def activate_slow_time(self):
         if self.slow_time_count > 0 and not self.slow_time_active:
             self.slow_time_active = True
             self.slow_time_timer = FPS * 4  # 4 seconds
             self.slow_time_count -= 1
+            self.audio.play("slow_time")
 
     def activate_shield(self):
         if self.shield_count > 0 and not self.player.shield_active:
             self.player.shield_active = True
             self.player.shield_timer = FPS * 5  # 5 seconds
             self.shield_count -= 1
+            self.audio.play("shield")
 
     def create_explosion(self, pos):
-        for _ in range(PARTICLE_COUNT):
-            self.particles.append(Particle(pos))
+        quality = self.quality
+        self.particles.emit(pos, quality.particles(PARTICLE_COUNT), vel_x=(-4, 4), vel_y=(-8, -2), radius=(4, 7),
+                            life=quality.life((20, 40)))
 
     def update_particles(self):
-        for p in self.particles[:]:
-            p.update()
-            if p.life <= 0 or p.radius <= 0:
-                self.particles.remove(p)
+        self.particles.update()
 
     def update(self):
         if self.game_over or self.paused:
             return
 
+        profiler = self.profiler
+        ring = self.rewind_ring
+        if ring is not None and ring.due(self.spawn_timer):
+            ring.push(self.spawn_timer, self.snapshot())
+            profiler.mark("snapshot")
         self.spawn_objects()
+        profiler.mark("spawn")
 
-        mouse_pos = pygame.mouse.get_pos()
-        self.player.update(mouse_pos)
+        self.player.update(self.input_source.get_pos())
 
-        for star in self.stars[:]:
+        # Walk the pools backwards so release_at can swap the last object into slot i
+        stars = self.stars
+        for i in range(len(stars) - 1, -1, -1):
+            star = stars[i]
             star.update(self.slow_time_active)
             if star.rect.colliderect(self.player.rect):
                 self.score += 10
                 self.create_explosion(star.rect.center)
-                self.stars.remove(star)
-            elif star.rect.top > HEIGHT:
-                self.stars.remove(star)
+                self.audio.play("catch")
+                stars.release_at(i)
+            elif star.rect.top > self.height:
+                stars.release_at(i)
                 self.missed += 1
 
-        for bomb in self.bombs[:]:
+        bombs = self.bombs
+        for i in range(len(bombs) - 1, -1, -1):
+            bomb = bombs[i]
             bomb.update(self.slow_time_active)
             if bomb.rect.colliderect(self.player.rect):
                 if self.player.shield_active:
                     self.player.shield_active = False
                     self.create_explosion(bomb.rect.center)
-                    self.bombs.remove(bomb)
+                    self.audio.play("explosion")
+                    bombs.release_at(i)
                 else:
                     self.create_explosion(bomb.rect.center)
-                    self.bombs.remove(bomb)
+                    bombs.release_at(i)
                     self.game_over = True
-            elif bomb.rect.top > HEIGHT:
-                self.bombs.remove(bomb)
+                    self.audio.play("explosion")
+                    self.audio.play("game_over")
+            elif bomb.rect.top > self.height:
+                bombs.release_at(i)
+        if self.game_over and self.scores and not self.practice:
+            self.scores.add_result(self.score, self.team, self.player_name)
+        profiler.mark("update")
 
         self.update_particles()
+        profiler.mark("particles")
 
         if self.slow_time_active:
             self.slow_time_timer -= 1
@@ -224,70 +401,198 @@ class Game:
 
         if self.score > self.highscore:
             self.highscore = self.score
-            save_highscore(self.highscore)
+            if self.scores:
+                self.scores.set_highscore(self.highscore)  # written in the background
 
-    def draw_ui(self, surf):
-        score_text = font_medium.render(f"Score: {self.score}", True, COLOR_TEXT)
-        highscore_text = font_small.render(f"High Score: {self.highscore}", True, COLOR_TEXT)
-        shield_text = font_small.render(f"Shields: {self.shield_count}", True, COLOR_SHIELD)
-        slow_text = font_small.render(f"Slow Time: {self.slow_time_count}", True, (255, 255, 0))
+    def draw_ui(self, surf, renderer):
+        score_text = hud.text("score_text", get_font(*FONT_MEDIUM), f"Score: {self.score}", COLOR_TEXT)
+        highscore_text = hud.text("highscore_text", get_font(*FONT_SMALL), f"High Score: {self.highscore}", COLOR_TEXT)
+        shield_text = hud.text("shield_text", get_font(*FONT_SMALL), f"Shields: {self.shield_count}", COLOR_SHIELD)
+        slow_text = hud.text("slow_text", get_font(*FONT_SMALL), f"Slow Time: {self.slow_time_count}", (255, 255, 0))
 
-        surf.blit(score_text, (20, 20))
-        surf.blit(highscore_text, (20, 70))
-        surf.blit(shield_text, (20, 110))
-        surf.blit(slow_text, (20, 140))
+        renderer.add(surf.blit(score_text, (20, 20)))
+        renderer.add(surf.blit(highscore_text, (20, 70)))
+        renderer.add(surf.blit(shield_text, (20, 110)))
+        renderer.add(surf.blit(slow_text, (20, 140)))
 
         if self.player.shield_active:
-            active = font_small.render("SHIELD ACTIVE!", True, COLOR_SHIELD)
-            surf.blit(active, (WIDTH//2 - active.get_width()//2, 30))
+            active = hud.text("shield_active", get_font(*FONT_SMALL), "SHIELD ACTIVE!", COLOR_SHIELD)
+            renderer.add(surf.blit(active, (self.width//2 - active.get_width()//2, 30)))
         if self.slow_time_active:
-            active = font_small.render("SLOW TIME ACTIVE!", True, (255, 255, 0))
-            surf.blit(active, (WIDTH//2 - active.get_width()//2, 60))
-
-    def draw(self, surf):
-        surf.fill(COLOR_BG)
-
-        for p in self.particles:
-            p.draw(surf)
+            active = hud.text("slow_time_active", get_font(*FONT_SMALL), "SLOW TIME ACTIVE!", (255, 255, 0))
+            renderer.add(surf.blit(active, (self.width//2 - active.get_width()//2, 60)))
+
+    # alpha: fraction of a tick since the last update(), for interpolation.
+    # renderer decides how much of the screen is cleared (see common/render.py);
+    # pointer is passed on to Player.draw
+    def draw(self, surf, alpha=1.0, renderer=None, pointer=None):
+        if renderer is None:
+            renderer = Renderer(COLOR_BG)
+        if self.game_over or self.paused:
+            alpha = 1.0  # nothing is moving
+            pointer = None
+        renderer.begin(surf)
 
-        for star in self.stars:
-            star.draw(surf)
+        renderer.add_all(self.particles.draw(surf, alpha))
 
-        for bomb in self.bombs:
-            bomb.draw(surf)
+        # Stars and bombs are one layer of pre-rendered sprites, drawn in one call
+        if self.quality.simple_sprites:
+            # Plain opaque blocks: no rounded corners, no fuse, no per-pixel alpha
+            batch = [(get_block(obj.color, obj.rect.size), (obj.rect.x, lerp(obj.prev_y, obj.rect.y, alpha)))
+                     for obj in self.stars.active + self.bombs.active]
+        else:
+            batch = [(obj.sprite, (obj.rect.x, lerp(obj.prev_y, obj.rect.y, alpha) + obj.sprite_dy))
+                     for obj in self.stars.active + self.bombs.active]
+        renderer.add_all(surf.blits(batch))
 
-        self.player.draw(surf)
-        self.draw_ui(surf)
+        renderer.add(self.player.draw(surf, alpha, pointer))
+        self.profiler.mark("draw")
+        self.draw_ui(surf, renderer)
 
         if self.game_over:
-            overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-            overlay.fill((0, 0, 0, 180))
-            surf.blit(overlay, (0, 0))
-            over_text = font_large.render("GAME OVER!", True, COLOR_TEXT_ALERT)
-            score_text = font_medium.render(f"Final Score: {self.score}", True, COLOR_TEXT)
-            restart_text = font_small.render("Press R to Restart or ESC to Quit", True, COLOR_TEXT)
-
-            surf.blit(over_text, (WIDTH//2 - over_text.get_width()//2, HEIGHT//2 - 100))
-            surf.blit(score_text, (WIDTH//2 - score_text.get_width()//2, HEIGHT//2 - 30))
-            surf.blit(restart_text, (WIDTH//2 - restart_text.get_width()//2, HEIGHT//2 + 40))
+            if self.quality.overlays:
+                renderer.add(surf.blit(get_overlay((self.width, self.height), (0, 0, 0, 180)), (0, 0)))
+            over_text = hud.text("over_text", get_font(*FONT_LARGE), "GAME OVER!", COLOR_TEXT_ALERT)
+            score_text = hud.text("final_score", get_font(*FONT_MEDIUM), f"Final Score: {self.score}", COLOR_TEXT)
+            restart_text = hud.text("restart_text", get_font(*FONT_SMALL), "Press R to Restart or ESC to Quit"
+                                    if self.rewind_ring is None else "Press R to Restart, B to Rewind or ESC to Quit",
+                                    COLOR_TEXT)
+
+            renderer.add(surf.blit(over_text, (self.width//2 - over_text.get_width()//2, self.height//2 - 100)))
+            renderer.add(surf.blit(score_text, (self.width//2 - score_text.get_width()//2, self.height//2 - 30)))
+            renderer.add(surf.blit(restart_text, (self.width//2 - restart_text.get_width()//2, self.height//2 + 40)))
+        self.profiler.mark("hud")
 
     def toggle_pause(self):
         self.paused = not self.paused
 
-    def draw_pause(self, surf):
-        overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 180))
-        surf.blit(overlay, (0, 0))
-        pause_text = font_large.render("PAUSED", True, COLOR_TEXT)
-        cont_text = font_medium.render("Press ESC to Resume", True, COLOR_TEXT)
-        surf.blit(pause_text, (WIDTH//2 - pause_text.get_width()//2, HEIGHT//2 - 50))
-        surf.blit(cont_text, (WIDTH//2 - cont_text.get_width()//2, HEIGHT//2 + 20))
+    # actions is a mix of the ACTION_* bits pressed since the last tick
+    def apply_actions(self, actions):
+        if actions & ACTION_PAUSE and not self.game_over:
+            self.toggle_pause()
+        if actions & ACTION_RESTART and self.game_over:
+            self.reset()
+        if actions & ACTION_REWIND and not self.paused:
+            self.rewind()
+        if not self.game_over and not self.paused:
+            if actions & ACTION_SHIELD:
+                self.activate_shield()
+            if actions & ACTION_SLOW_TIME:
+                self.activate_slow_time()
+
+    def draw_pause(self, surf, renderer=None):
+        if renderer is None:
+            renderer = Renderer(COLOR_BG)
+        if self.quality.overlays:
+            renderer.add(surf.blit(get_overlay((self.width, self.height), (0, 0, 0, 180)), (0, 0)))
+        pause_text = hud.text("pause_text", get_font(*FONT_LARGE), "PAUSED", COLOR_TEXT)
+        cont_text = hud.text("cont_text", get_font(*FONT_MEDIUM), "Press ESC to Resume", COLOR_TEXT)
+        renderer.add(surf.blit(pause_text, (self.width//2 - pause_text.get_width()//2, self.height//2 - 50)))
+        renderer.add(surf.blit(cont_text, (self.width//2 - cont_text.get_width()//2, self.height//2 + 20)))
 
 def main():
-    game = Game()
+    parser = argparse.ArgumentParser(description="Catch the Falling Stars - Bomb Edition")
+    parser.add_argument("--dirty", action="store_true", help="only redraw the parts of the screen that changed")
+    parser.add_argument("--team", help="team from game0/teams.txt to put the scores under, e.g. \"G9A Team 3\"")
+    parser.add_argument("--player", help="player name shown on the leaderboard")
+    parser.add_argument("--profile", action="store_true", help="show frame timings (F3 toggles them)")
+    parser.add_argument("--profile-out", help="save per-frame timings to this .csv or .json file on exit")
+    parser.add_argument("--full-quality", action="store_true", help="never scale down effects when frames are slow")
+    parser.add_argument("--low-latency", action="store_true", help="draw the player where the mouse is right now")
+    parser.add_argument("--resolution", type=parse_size, metavar="WxH",
+                        help="draw at this size (e.g. 1280x720) and scale it to the screen")
+    parser.add_argument("--record", help="save the session's input to this file (play it with replay.py)")
+    parser.add_argument("--seed", type=int, help="random seed (a new one every run by default)")
+    parser.add_argument("--spectate", type=int, metavar="PORT", help="let others watch with spectate.py on this port")
+    parser.add_argument("--spectate-host", default="0.0.0.0", help="address to serve spectators on (default: all)")
+    parser.add_argument("--no-sound", action="store_true", help="play no sound effects or music")
+    parser.add_argument("--level", default=DEFAULT_LEVEL,
+                        help="level file, or the name of one in Projects/levels (default: %(default)s)")
+    parser.add_argument("--resume", action="store_true", help="continue the game that was running when the game "
+                                                              "last crashed (saved every few seconds)")
+    args = parser.parse_args()
+    if args.resume and args.record:
+        parser.error("--resume cannot be recorded: a recording starts from a new game")
+    startup.mark("imports")
+    team = None
+    if args.team:
+        team = find_team(load_roster(), args.team)
+        if team is None:
+            print(f"Unknown team: {args.team}")
+            sys.exit(1)
+    try:
+        level = load_level(args.level)
+    except LevelError as e:
+        print(f"Bad level: {e}")
+        sys.exit(1)
+
+    # Only the parts of pygame the game uses; Audio opens the mixer with a small buffer itself
+    pygame.display.init()
+    pygame.font.init()
+    # At the monitor's resolution, or at --resolution scaled up to it
+    screen = open_fullscreen(args.resolution)
+    width, height = screen.get_size()
+    pygame.display.set_caption("Catch the Falling Stars - Bomb Edition")
+    startup.mark("display")
+    audio = Audio(enabled=not args.no_sound)  # every effect is loaded now, so playing one never waits
+    audio.play_music()
+    startup.mark("audio")
+    clock = pygame.time.Clock()
+    scores = ScoreStore(HIGHSCORE_FILE, SCORES_LOG)
+    profiler = FrameProfiler(keep_records=bool(args.profile_out))
+    if args.profile:
+        profiler.toggle_overlay()
+    quality = QualityGovernor(adaptive=not args.full_quality)
+    latency = LatencyProbe()  # how old the mouse position on screen is
+    if args.low_latency:
+        allow_events(pygame.QUIT, pygame.KEYDOWN)  # the game only reacts to these
+    # All randomness comes from this seed and all input is read once per tick,
+    # so the seed and the per-tick input are enough to replay the session
+    seed = args.seed if args.seed is not None else random.randrange(2 ** 32)
+    random.seed(seed)
+    tick_input = TickInput()
+    recording = Recording(seed, {"game": "game2", "width": width, "height": height, "level": args.level,
+                                 "rewind": True}) if args.record else None
+    # B rewinds a few seconds; snapshots are part of the game state, so recordings replay them too
+    game = Game(width, height, input_source=tick_input, scores=scores, team=team, player=args.player,
+                profiler=profiler, quality=quality, audio=audio, level=level, rewind=True)
+    resume = SnapshotWriter(RESUME_FILE)  # writes the resume file off the game loop
+    saved_at = None  # game tick of the last resume file
+    if args.resume:
+        data = load_snapshot(RESUME_FILE)
+        try:
+            if data is None:
+                raise ValueError("no saved game")
+            game.restore(data)
+            game.paused = True  # give the player a moment to find the mouse
+            game.practice = True  # the game before the crash was not watched to the end
+            saved_at = game.spawn_timer
+        except (ValueError, struct.error) as e:
+            print(f"Could not resume, starting a new game: {e}")
+            game.reset()
+    timestep = FixedTimestep(FPS)
+    # Scrolling stars behind the game; dirty-rectangle mode needs a still background
+    background = Starfield(COLOR_BG, scroll=not args.dirty)
+    renderer = Renderer(background, dirty=args.dirty)
+    actions = 0
+    for font in (FONT_LARGE, FONT_MEDIUM, FONT_SMALL):
+        get_font(*font)
+    startup.mark("fonts")
+    spectators = None
+    if args.spectate is not None:
+        from spectator import SpectatorServer  # only imported when used, asyncio slows down the start
+        spectators = SpectatorServer(args.spectate_host, args.spectate)
+        try:
+            spectators.start()
+        except OSError as e:
+            print(f"Could not serve spectators on port {args.spectate}: {e}")
+            sys.exit(1)
+        print(f"Spectators can watch on port {spectators.port}")
+        startup.mark("spectators")
 
     running = True
     while running:
+        quality.begin()
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
@@ -296,25 +601,81 @@ def main():
                     if game.game_over:
                         running = False
                     else:
-                        game.toggle_pause()
-                if event.key == pygame.K_r and game.game_over:
-                    game.reset()
-                if event.key == pygame.K_s and not game.game_over and not game.paused:
-                    game.activate_shield()
-                if event.key == pygame.K_t and not game.game_over and not game.paused:
-                    game.activate_slow_time()
-
-        if not game.paused:
-            game.update()
-
-        game.draw(screen)
+                        actions |= ACTION_PAUSE
+                if event.key == pygame.K_r:
+                    actions |= ACTION_RESTART
+                if event.key == pygame.K_s:
+                    actions |= ACTION_SHIELD
+                if event.key == pygame.K_t:
+                    actions |= ACTION_SLOW_TIME
+                if event.key == pygame.K_b:
+                    actions |= ACTION_REWIND
+                if event.key == pygame.K_F3:
+                    profiler.toggle_overlay()
+        profiler.mark("events")
+
+        # Simulate in fixed ticks; drawing runs as often as the display allows
+        for _ in range(timestep.advance()):
+            tick_input.pos = pygame.mouse.get_pos()
+            latency.sample()
+            if recording is not None:
+                recording.add(tick_input.pos, actions)
+            game.apply_actions(actions)
+            actions = 0
+            if not game.paused:
+                game.update()
+            if not game.paused and not game.game_over:
+                background.advance(0.5 if game.slow_time_active else 1.0)  # slow time slows the stars too
+            # Keep a resume file of the running game, in case the game crashes
+            if game.game_over:
+                if saved_at is not None:
+                    resume.remove()
+                    saved_at = None
+            elif game.spawn_timer % RESUME_EVERY == 0 and game.spawn_timer != saved_at:
+                resume.save(game.snapshot())
+                saved_at = game.spawn_timer
+            if spectators is not None:
+                spectators.publish(game)
+
+        pointer = None
+        if args.low_latency:
+            pointer = pygame.mouse.get_pos()
+            latency.sample()
+        game.draw(screen, timestep.alpha, renderer, pointer)
 
         if game.paused and not game.game_over:
-            game.draw_pause(screen)
-
-        pygame.display.flip()
-        clock.tick(FPS)
-
+            game.draw_pause(screen, renderer)
+        renderer.add_all(profiler.draw(screen, get_font(*FONT_SMALL), (width - 360, 20)))
+        profiler.mark("hud")
+
+        renderer.present()
+        latency.presented()
+        startup.report()
+        profiler.mark("flip")
+        quality.end()  # the work of this frame, without the wait below
+        if args.low_latency:
+            clock.tick_busy_loop(RENDER_FPS)  # wakes up on time, at the cost of a busy CPU core
+        else:
+            clock.tick(RENDER_FPS)
+        profiler.mark("tick")
+        profiler.end_frame(stars=len(game.stars), bombs=len(game.bombs), particles=len(game.particles),
+                           quality=quality.level, latency_ms=round(latency.last_ms, 2))
+
+    if saved_at is not None:
+        resume.remove()  # a clean exit, nothing to resume
+    resume.close()
+    if recording is not None:
+        recording.info.update(score=game.score, missed=game.missed)
+        recording.save(args.record)
+    if args.profile_out:
+        profiler.export(args.profile_out)
+    if args.low_latency or args.profile:
+        print(latency.summary())
+    if args.profile:
+        print(audio.summary())
+    if spectators is not None:
+        spectators.close()
+    scores.close()
     pygame.quit()
     sys.exit()
 
@@ -0,0 +1,99 @@
+"""
+Run game2 without a window or any rendering, as fast as the CPU allows.
+
+Useful for balancing and regression checks, e.g. simulate 1000 seeded games:
+    python headless.py --games 1000 --seed 1 --policy chase
+"""
+import os
+
+# No real display is needed - this must be set before pygame is imported
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import random
+import time
+
+from game import Game, DEFAULT_LEVEL
+from common.levels import load_level
+
+SIM_WIDTH, SIM_HEIGHT = 1920, 1080
+MAX_TICKS = 60 * 60 * 10  # 10 minutes of game time
+
+
+# Policies take the Game and return where the "mouse" should be this tick
+def idle_policy(game):
+    return game.player.rect.center
+
+
+def chase_policy(game):
+    # Follow the lowest star, but step sideways when a bomb is right above us
+    player = game.player.rect
+    target_x = player.centerx
+    if game.stars:
+        target_x = max(game.stars, key=lambda s: s.rect.y).rect.centerx
+    for bomb in game.bombs:
+        if abs(bomb.rect.centerx - target_x) < 60 and bomb.rect.bottom > player.top - 200:
+            target_x += 120 if bomb.rect.centerx <= target_x else -120
+    return (target_x, player.centery)
+
+
+POLICIES = {"idle": idle_policy, "chase": chase_policy}
+
+
+class PolicyInput:
+    # Stands in for pygame.mouse: get_pos() asks the policy instead
+    def __init__(self, policy):
+        self.policy = policy
+        self.game = None
+
+    def get_pos(self):
+        return self.policy(self.game)
+
+
+def make_game(policy, width=SIM_WIDTH, height=SIM_HEIGHT, level=DEFAULT_LEVEL, spawn_rng=None):
+    source = PolicyInput(policy)
+    game = Game(width, height, input_source=source, level=load_level(level), spawn_rng=spawn_rng)
+    source.game = game
+    return game
+
+
+# paired=True draws the spawns from their own stream seeded with `seed`, so
+# every policy meets the same spawns on the same seed (see Game.spawn_paired)
+def run_game(policy, seed, max_ticks=MAX_TICKS, width=SIM_WIDTH, height=SIM_HEIGHT, level=DEFAULT_LEVEL,
+             paired=False):
+    random.seed(seed)
+    game = make_game(policy, width, height, level, random.Random(seed) if paired else None)
+    ticks = 0
+    while not game.game_over and ticks < max_ticks:
+        game.update()
+        ticks += 1
+    return {"seed": seed, "score": game.score, "missed": game.missed, "ticks": ticks}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate game2 without a display")
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="chase")
+    parser.add_argument("--max-ticks", type=int, default=MAX_TICKS)
+    parser.add_argument("--level", default=DEFAULT_LEVEL, help="level file or name (default: %(default)s)")
+    args = parser.parse_args()
+    if args.games < 1 or args.max_ticks < 1:
+        parser.error("--games and --max-ticks must be at least 1")
+
+    policy = POLICIES[args.policy]
+    start = time.perf_counter()
+    results = [run_game(policy, args.seed + i, args.max_ticks, level=args.level) for i in range(args.games)]
+    elapsed = time.perf_counter() - start
+
+    total_ticks = sum(r["ticks"] for r in results)
+    avg_score = sum(r["score"] for r in results) / len(results)
+    avg_missed = sum(r["missed"] for r in results) / len(results)
+    print(f"{args.games} games, {total_ticks} ticks in {elapsed:.2f}s "
+          f"({total_ticks / max(elapsed, 1e-9):.0f} ticks/s)")
+    print(f"Average score: {avg_score:.1f}  Average missed: {avg_missed:.1f}")
+
+
+if __name__ == "__main__":
+    main()
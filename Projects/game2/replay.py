@@ -0,0 +1,115 @@
+"""
+Play back a session recorded with: python game.py --record session.rec
+
+By default the session is re-run without a window as fast as the CPU allows and
+the final score is checked against the recording; --realtime shows it at normal
+speed instead. --until stops at a tick, e.g. just before a reported frame spike:
+    python replay.py session.rec
+    python replay.py session.rec --realtime --until 5400
+"""
+import argparse
+import os
+import sys
+import time
+
+if "--realtime" not in sys.argv:
+    # No real display is needed - this must be set before pygame is imported
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import random
+
+import pygame
+
+from game import Game, COLOR_BG, DEFAULT_LEVEL, FPS, RENDER_FPS
+from common.levels import load_level
+from common.loop import FixedTimestep
+from common.render import Renderer
+from common.replay import Recording, TickInput
+
+
+def start(recording):
+    random.seed(recording.seed)
+    tick_input = TickInput()
+    info = recording.info
+    game = Game(info["width"], info["height"], input_source=tick_input,
+                level=load_level(info.get("level", DEFAULT_LEVEL)), rewind=info.get("rewind", False))
+    return game, tick_input
+
+
+def step(game, tick_input, tick):
+    x, y, actions = tick
+    tick_input.pos = (x, y)
+    game.apply_actions(actions)
+    if not game.paused:
+        game.update()
+
+
+def replay_fast(recording, until):
+    game, tick_input = start(recording)
+    started = time.perf_counter()
+    ticks = 0
+    for tick in recording:
+        if ticks == until:
+            break
+        step(game, tick_input, tick)
+        ticks += 1
+    elapsed = time.perf_counter() - started
+    print(f"{ticks} ticks in {elapsed:.2f}s ({ticks / max(elapsed, 1e-9):.0f} ticks/s)")
+    return game, ticks
+
+
+def replay_realtime(recording, until):
+    screen = pygame.display.set_mode((recording.info["width"], recording.info["height"]))
+    pygame.display.set_caption("Catch the Falling Stars - Replay")
+    game, tick_input = start(recording)
+    timestep = FixedTimestep(FPS)
+    renderer = Renderer(COLOR_BG)
+    clock = pygame.time.Clock()
+    ticks_left = iter(recording)
+    ticks = 0
+    running = True
+    while running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                running = False
+        for _ in range(timestep.advance()):
+            tick = next(ticks_left, None)
+            if tick is None or ticks == until:
+                running = False
+                break
+            step(game, tick_input, tick)
+            ticks += 1
+        game.draw(screen, timestep.alpha, renderer)
+        if game.paused and not game.game_over:
+            game.draw_pause(screen, renderer)
+        renderer.present()
+        clock.tick(RENDER_FPS)
+    return game, ticks
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded game2 session")
+    parser.add_argument("recording")
+    parser.add_argument("--realtime", action="store_true", help="show the replay in a window at normal speed")
+    parser.add_argument("--until", type=int, help="stop after this many ticks")
+    args = parser.parse_args()
+
+    recording = Recording.load(args.recording)
+    if args.realtime:
+        game, ticks = replay_realtime(recording, args.until)
+    else:
+        game, ticks = replay_fast(recording, args.until)
+    print(f"Score: {game.score}  Missed: {game.missed}")
+    if ticks == len(recording) and "score" in recording.info:
+        if (game.score, game.missed) == (recording.info["score"], recording.info["missed"]):
+            print("Matches the recorded session")
+        else:
+            print(f"Does not match the recording (score {recording.info['score']}, "
+                  f"missed {recording.info['missed']})")
+            sys.exit(1)
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Watch a game2 session that was started with: python game.py --spectate 7777
+    python spectate.py 192.168.1.20 --port 7777
+
+The window shows the player's screen at their resolution, scaled to fit.
+"""
+import argparse
+import sys
+
+import pygame
+
+from game import (COLOR_BG, COLOR_PLAYER, COLOR_SHIELD, COLOR_STAR_YELLOW, COLOR_STAR_WHITE, COLOR_TEXT,
+                  COLOR_TEXT_ALERT, STAR_SIZE, BOMB_SIZE, PLAYER_SIZE, FUSE_HEIGHT, FONT_LARGE, FONT_MEDIUM,
+                  FONT_SMALL, make_bomb_sprite)
+from common.fonts import get_font
+from common.hud import Hud, get_overlay
+from common.sprites import get_rect, get_sprite
+from spectator import (DEFAULT_PORT, FLAG_SHIELD, FLAG_GAME_OVER, FLAG_PAUSED, SpectatorClient, unpack)
+
+
+def draw_state(surf, fields, hud):
+    surf.fill(COLOR_BG)
+    batch = []
+    for x, y, white in fields["star_list"]:
+        color = COLOR_STAR_WHITE if white else COLOR_STAR_YELLOW
+        batch.append((get_rect(color, (STAR_SIZE, STAR_SIZE), border_radius=6), (x, y)))
+    bomb = get_sprite(("bomb", BOMB_SIZE), lambda: make_bomb_sprite(BOMB_SIZE))
+    for x, y in fields["bomb_list"]:
+        batch.append((bomb, (x, y - FUSE_HEIGHT)))
+    surf.blits(batch)
+
+    flags = fields["flags"]
+    player = pygame.Rect(fields["player_x"], fields["player_y"], PLAYER_SIZE, PLAYER_SIZE)
+    pygame.draw.rect(surf, COLOR_SHIELD if flags & FLAG_SHIELD else COLOR_PLAYER, player, border_radius=10)
+    if flags & FLAG_SHIELD:
+        pygame.draw.rect(surf, (0, 255, 100), player.inflate(12, 12), 4, border_radius=16)
+
+    surf.blit(hud.text("score", get_font(*FONT_MEDIUM), f"Score: {fields['score']}", COLOR_TEXT), (20, 20))
+    surf.blit(hud.text("highscore", get_font(*FONT_SMALL), f"High Score: {fields['highscore']}", COLOR_TEXT), (20, 70))
+    surf.blit(hud.text("shields", get_font(*FONT_SMALL), f"Shields: {fields['shield_count']}", COLOR_SHIELD), (20, 110))
+    surf.blit(hud.text("slow", get_font(*FONT_SMALL), f"Slow Time: {fields['slow_time_count']}", (255, 255, 0)),
+              (20, 140))
+    if flags & (FLAG_GAME_OVER | FLAG_PAUSED):
+        width, height = surf.get_size()
+        surf.blit(get_overlay((width, height), (0, 0, 0, 180)), (0, 0))
+        if flags & FLAG_GAME_OVER:
+            text = hud.text("banner", get_font(*FONT_LARGE), "GAME OVER!", COLOR_TEXT_ALERT)
+        else:
+            text = hud.text("banner", get_font(*FONT_LARGE), "PAUSED", COLOR_TEXT)
+        surf.blit(text, (width // 2 - text.get_width() // 2, height // 2 - 50))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Watch a game2 session started with --spectate")
+    parser.add_argument("host", nargs="?", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args()
+
+    try:
+        client = SpectatorClient(args.host, args.port)
+    except OSError as e:
+        print(f"Could not connect to {args.host}:{args.port}: {e}")
+        sys.exit(1)
+    pygame.display.init()
+    pygame.font.init()
+    clock = pygame.time.Clock()
+    hud = Hud()
+    screen = None
+    running = True
+    while running and client.connected:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                running = False
+        # Only the newest state is drawn; ticks that arrived together are not drawn one by one
+        if client.poll():
+            fields = unpack(client.state)
+            size = (fields["width"], fields["height"])
+            if screen is None or screen.get_size() != size:
+                # SCALED: we draw at the player's resolution and SDL scales it to the window
+                screen = pygame.display.set_mode(size, pygame.SCALED | pygame.RESIZABLE)
+                pygame.display.set_caption(f"Catch the Falling Stars - watching {args.host}")
+            draw_state(screen, fields, hud)
+            pygame.display.flip()
+        clock.tick(120)
+    if not client.connected:
+        print("The game closed the connection")
+    client.close()
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
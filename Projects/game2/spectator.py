@@ -0,0 +1,251 @@
+"""
+Watch a game2 session live from other screens.
+
+The player starts the game with --spectate, which serves the game state on a
+TCP port; spectators on the same machine or LAN watch it with spectate.py:
+
+    python game.py --spectate 7777
+    python spectate.py 192.168.1.20 --port 7777
+
+Every tick the state (player, stars, bombs, score, power-ups) is packed into an
+array of int32 values. A spectator gets one full keyframe when it joins and
+after that only the difference to the previous tick, zlib-compressed - stars
+fall at a steady speed, so most of the difference is the same few numbers and a
+tick costs a few dozen bytes. The server runs asyncio on its own thread: the
+game loop only hands over the array. Each spectator has a short queue; one that
+cannot keep up has its queue dropped and gets a new keyframe instead, so a slow
+viewer never holds up the game or uses more than a bounded amount of memory.
+"""
+import asyncio
+import socket
+import struct
+import threading
+import zlib
+
+import numpy as np
+
+DEFAULT_PORT = 7777
+MAX_QUEUE = 30  # ticks waiting for one spectator before it is sent a keyframe instead
+READ_SIZE = 256  # spectators send nothing; anything they do send is read and dropped in chunks this big
+
+# Message: payload length, kind, tick number, then the zlib-compressed int32 array
+MESSAGE = struct.Struct("<IBI")
+KEYFRAME = 0
+DELTA = 1
+
+# The array starts with these values, followed by (x, y, white) per star and (x, y) per bomb
+FIELDS = ("width", "height", "player_x", "player_y", "flags", "score", "highscore", "missed",
+          "shield_count", "slow_time_count", "stars", "bombs")
+HEADER = len(FIELDS)
+STAR_VALUES = 3
+BOMB_VALUES = 2
+FLAG_SHIELD = 1
+FLAG_SLOW_TIME = 2
+FLAG_GAME_OVER = 4
+FLAG_PAUSED = 8
+
+
+# The state spectators see, from a game.Game
+def snapshot(game, white=(255, 255, 255)):
+    stars = game.stars.active
+    bombs = game.bombs.active
+    flags = ((FLAG_SHIELD if game.player.shield_active else 0) | (FLAG_SLOW_TIME if game.slow_time_active else 0)
+             | (FLAG_GAME_OVER if game.game_over else 0) | (FLAG_PAUSED if game.paused else 0))
+    values = [game.width, game.height, game.player.rect.x, game.player.rect.y, flags, game.score,
+              game.highscore, game.missed, game.shield_count, game.slow_time_count, len(stars), len(bombs)]
+    for star in stars:
+        values += (star.rect.x, star.rect.y, star.color == white)
+    for bomb in bombs:
+        values += (bomb.rect.x, bomb.rect.y)
+    return np.array(values, dtype=np.int32)
+
+
+def _resized(values, length):
+    if len(values) == length:
+        return values
+    out = np.zeros(length, dtype=np.int32)
+    out[:min(length, len(values))] = values[:length]
+    return out
+
+
+def encode(kind, tick, state, previous=None):
+    if kind == DELTA:
+        state = state - _resized(previous, len(state))  # int32 wraps around, decode() undoes it
+    payload = zlib.compress(state.tobytes(), 1)
+    return MESSAGE.pack(len(payload), kind, tick) + payload
+
+
+# Returns (tick, state) for one message body; previous is the state before it
+def decode(kind, tick, payload, previous=None):
+    values = np.frombuffer(zlib.decompress(payload), dtype=np.int32)
+    if kind == DELTA:
+        if previous is None:
+            raise ValueError("delta frame without a keyframe")
+        values = _resized(previous, len(values)) + values
+    return tick, values.copy()
+
+
+# Splits a state array into a dict of the header values plus "star_list" and "bomb_list"
+def unpack(state):
+    fields = dict(zip(FIELDS, state[:HEADER].tolist()))
+    stars_end = HEADER + fields["stars"] * STAR_VALUES
+    fields["star_list"] = state[HEADER:stars_end].reshape(-1, STAR_VALUES).tolist()
+    fields["bomb_list"] = state[stars_end:stars_end + fields["bombs"] * BOMB_VALUES].reshape(-1, BOMB_VALUES).tolist()
+    return fields
+
+
+class _Spectator:
+    def __init__(self, writer):
+        self.writer = writer
+        self.queue = asyncio.Queue(MAX_QUEUE)
+        self.needs_keyframe = True
+
+
+class SpectatorServer:
+    # Call start() once, publish(game) every tick and close() at exit
+    def __init__(self, host="0.0.0.0", port=DEFAULT_PORT):
+        self.host = host
+        self.port = port
+        self.spectators = set()
+        self.bytes_sent = 0
+        self._tick = 0
+        self._previous = None
+        self._loop = None
+        self._stopped = None
+        self._ready = threading.Event()
+        self._error = None
+        self._thread = None
+
+    # Opens the port; raises OSError if it cannot (e.g. already in use)
+    def start(self):
+        self._thread = threading.Thread(target=asyncio.run, args=(self._serve(),), name="SpectatorServer",
+                                        daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if self._error:
+            raise self._error
+
+    async def _serve(self):
+        self._loop = asyncio.get_running_loop()
+        self._stopped = asyncio.Event()
+        try:
+            server = await asyncio.start_server(self._handle, self.host, self.port)
+        except OSError as e:
+            self._error = e
+            self._ready.set()
+            return
+        self.port = server.sockets[0].getsockname()[1]
+        self._ready.set()
+        async with server:
+            await self._stopped.wait()
+        for spectator in list(self.spectators):
+            spectator.writer.close()
+
+    async def _handle(self, reader, writer):
+        sock = writer.get_extra_info("socket")
+        if sock is not None:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        spectator = _Spectator(writer)
+        self.spectators.add(spectator)
+        sender = asyncio.ensure_future(self._send(spectator))
+        closed = asyncio.ensure_future(self._receive(reader))  # returns when the spectator leaves
+        try:
+            await asyncio.wait((sender, closed), return_when=asyncio.FIRST_COMPLETED)
+        except asyncio.CancelledError:
+            pass  # the server is shutting down
+        finally:
+            self.spectators.discard(spectator)
+            sender.cancel()
+            closed.cancel()
+            writer.close()
+
+    # Reads until the spectator closes the connection. Nothing it sends is kept,
+    # so a peer that floods the port costs a small buffer, not memory
+    async def _receive(self, reader):
+        try:
+            while await reader.read(READ_SIZE):
+                pass
+        except ConnectionError:
+            pass
+
+    async def _send(self, spectator):
+        try:
+            while True:
+                message = await spectator.queue.get()
+                spectator.writer.write(message)
+                self.bytes_sent += len(message)
+                await spectator.writer.drain()
+        except ConnectionError:
+            pass
+
+    # Runs on the server thread: encodes the tick once and queues it for everyone
+    def _broadcast(self, tick, state):
+        keyframe = delta = None
+        for spectator in self.spectators:
+            queue = spectator.queue
+            if queue.full():
+                # Too far behind: skip what it has not seen and start again from this tick
+                while not queue.empty():
+                    queue.get_nowait()
+                spectator.needs_keyframe = True
+            if spectator.needs_keyframe:
+                if keyframe is None:
+                    keyframe = encode(KEYFRAME, tick, state)
+                queue.put_nowait(keyframe)
+                spectator.needs_keyframe = False
+            else:
+                if delta is None:
+                    delta = encode(DELTA, tick, state, self._previous)
+                queue.put_nowait(delta)
+        self._previous = state
+
+    # Called from the game loop once per tick; cheap, and free while nobody is watching
+    def publish(self, game):
+        if not self.spectators or self._loop is None:
+            return
+        self._tick += 1
+        self._loop.call_soon_threadsafe(self._broadcast, self._tick, snapshot(game))
+
+    def close(self):
+        if self._loop is not None and self._stopped is not None:
+            self._loop.call_soon_threadsafe(self._stopped.set)
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+
+
+# Reads the stream from a server; poll() never blocks, so it fits in a pygame loop
+class SpectatorClient:
+    def __init__(self, host, port=DEFAULT_PORT):
+        self.sock = socket.create_connection((host, port), timeout=5)
+        self.sock.setblocking(False)
+        self.buffer = bytearray()
+        self.state = None
+        self.tick = 0
+        self.connected = True
+
+    # Reads whatever has arrived; returns True if the state changed
+    def poll(self):
+        while self.connected:
+            try:
+                data = self.sock.recv(65536)
+            except (BlockingIOError, InterruptedError):
+                break
+            except OSError:
+                data = b""
+            if not data:
+                self.connected = False
+                break
+            self.buffer += data
+        changed = False
+        while len(self.buffer) >= MESSAGE.size:
+            length, kind, tick = MESSAGE.unpack_from(self.buffer)
+            end = MESSAGE.size + length
+            if len(self.buffer) < end:
+                break
+            self.tick, self.state = decode(kind, tick, bytes(self.buffer[MESSAGE.size:end]), self.state)
+            del self.buffer[:end]
+            changed = True
+        return changed
+
+    def close(self):
+        self.sock.close()
@@ -0,0 +1,188 @@
+"""
+Practice tournament: every team in the roster plays the same seeded headless
+games of game2, spread over a process pool.
+
+Each team is an entrant with a paddle policy, either a built-in one from
+headless.py or a .py file that defines policy(game) and returns where the
+"mouse" should be this tick:
+    python tournament.py --matches 200 --seed 1 --entry "G9A Team 3=bots/g9a3.py"
+
+Every entrant plays seeds seed .. seed + matches - 1, and match i draws its
+spawns from its own random.Random(seed) that gives the same numbers every tick
+however the game goes (common random numbers, see Game.spawn_paired). So every
+entrant meets the same stars and bombs at the same places and times; only
+where a higher score has already raised the level's spawn chances does an
+entrant see a few extra ones on top.
+
+Matches are sent to the workers in chunks, a few per worker, so the pool
+stays busy to the end and the run time drops almost linearly with --workers.
+The standings give the mean score, misses and survival time of each team with
+a 95% confidence interval.
+"""
+import os
+
+# No real display is needed - this must be set before pygame is imported
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import importlib.util
+import json
+import math
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from game import DEFAULT_LEVEL, FPS  # also puts common/ on the path
+from headless import MAX_TICKS, POLICIES, run_game
+from common.levels import LevelError, load_level
+from common.teams import load_roster
+
+CHUNKS_PER_WORKER = 4
+Z_95 = 1.96
+
+# Policies loaded in this process, by spec
+_policies = {}
+
+
+# A spec is a built-in policy name or the path of a .py file defining policy(game)
+def load_policy(spec):
+    policy = _policies.get(spec)
+    if policy is None:
+        if spec in POLICIES:
+            policy = POLICIES[spec]
+        elif spec.endswith(".py") and os.path.isfile(spec):
+            module_spec = importlib.util.spec_from_file_location(f"policy_{len(_policies)}", spec)
+            module = importlib.util.module_from_spec(module_spec)
+            module_spec.loader.exec_module(module)
+            policy = getattr(module, "policy", None)
+            if not callable(policy):
+                raise ValueError(f"{spec} does not define policy(game)")
+        else:
+            raise ValueError(f"unknown policy {spec!r}: use one of {', '.join(sorted(POLICIES))} or a .py file")
+        _policies[spec] = policy
+    return policy
+
+
+# Runs in a worker: one team's games for a chunk of seeds
+def play_chunk(job):
+    team, spec, seeds, max_ticks, level = job
+    policy = load_policy(spec)
+    return team, [run_game(policy, seed, max_ticks, level=level, paired=True) for seed in seeds]
+
+
+# Splits the games into about CHUNKS_PER_WORKER jobs per worker; a job is one
+# team's games for a run of seeds, so each worker loads a policy only once per job
+def make_jobs(entrants, seeds, max_ticks, level, workers):
+    size = math.ceil(len(seeds) * len(entrants) / (workers * CHUNKS_PER_WORKER))
+    size = max(1, min(size, len(seeds)))
+    return [(team, spec, seeds[i:i + size], max_ticks, level)
+            for team, spec in entrants.items()
+            for i in range(0, len(seeds), size)]
+
+
+# (mean, half width of the 95% confidence interval)
+def mean_ci(values):
+    n = len(values)
+    mean = sum(values) / n
+    if n < 2:
+        return mean, 0.0
+    variance = sum((v - mean) ** 2 for v in values) / (n - 1)
+    return mean, Z_95 * math.sqrt(variance / n)
+
+
+def standings(entrants, results):
+    rows = []
+    for team, spec in entrants.items():
+        games = results[team]
+        rows.append({
+            "team": team,
+            "policy": spec,
+            "matches": len(games),
+            "score": mean_ci([g["score"] for g in games]),
+            "missed": mean_ci([g["missed"] for g in games]),
+            "survival": mean_ci([g["ticks"] / FPS for g in games]),
+        })
+    rows.sort(key=lambda row: (-row["score"][0], row["missed"][0]))
+    return rows
+
+
+def print_standings(rows):
+    width = max(len("Team"), *(len(row["team"]) for row in rows))
+    print(f"{'#':>3}  {'Team':<{width}}  {'Policy':<12}  {'Score':>17}  {'Missed':>13}  {'Survival s':>15}")
+    for rank, row in enumerate(rows, 1):
+        score, missed, survival = row["score"], row["missed"], row["survival"]
+        print(f"{rank:>3}  {row['team']:<{width}}  {os.path.basename(row['policy']):<12}  "
+              f"{score[0]:>8.1f} ± {score[1]:<6.1f}  {missed[0]:>6.1f} ± {missed[1]:<4.1f}  "
+              f"{survival[0]:>7.1f} ± {survival[1]:<5.1f}")
+
+
+def parse_entry(text):
+    team, sep, spec = text.partition("=")
+    if not sep or not team.strip() or not spec.strip():
+        raise argparse.ArgumentTypeError(f"expected TEAM=POLICY, not {text!r}")
+    return team.strip(), spec.strip()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play every roster team's policy on the same seeded game2 games")
+    parser.add_argument("--matches", type=int, default=100, help="games per team")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first game")
+    parser.add_argument("--max-ticks", type=int, default=MAX_TICKS)
+    parser.add_argument("--level", default=DEFAULT_LEVEL, help="level file or name (default: %(default)s)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--entry", type=parse_entry, action="append", default=[], metavar="TEAM=POLICY",
+                        help="policy of one team: a built-in name or a .py file (repeatable)")
+    parser.add_argument("--default-policy", default="chase", help="policy of teams without an --entry")
+    parser.add_argument("--teams", nargs="+", metavar="TEAM", help="only these teams (default: the whole roster)")
+    parser.add_argument("--json", metavar="PATH", help="also write the standings and every game to PATH")
+    args = parser.parse_args()
+
+    if args.matches < 1 or args.workers < 1:
+        parser.error("--matches and --workers must be at least 1")
+    roster = list(load_roster())
+    entries = dict(args.entry)
+    unknown = sorted(set(entries).union(args.teams or ()) - set(roster))
+    if unknown:
+        parser.error(f"not in the roster: {', '.join(unknown)}")
+    teams = args.teams or roster
+    entrants = {team: entries.get(team, args.default_policy) for team in teams}
+    # Fail here rather than in every worker
+    try:
+        load_level(args.level)
+    except LevelError as e:
+        parser.error(str(e))
+    for spec in set(entrants.values()):
+        try:
+            load_policy(spec)
+        except Exception as e:
+            parser.error(str(e))
+
+    seeds = list(range(args.seed, args.seed + args.matches))
+    jobs = make_jobs(entrants, seeds, args.max_ticks, args.level, args.workers)
+    results = {team: [] for team in entrants}
+    total = len(entrants) * len(seeds)
+    done = 0
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        for future in as_completed([pool.submit(play_chunk, job) for job in jobs]):
+            team, games = future.result()
+            results[team].extend(games)
+            done += len(games)
+            print(f"\r{done}/{total} matches", end="", flush=True)
+    elapsed = time.perf_counter() - start
+    total_ticks = sum(g["ticks"] for games in results.values() for g in games)
+    print(f"\r{total} matches, {total_ticks} ticks in {elapsed:.2f}s on {args.workers} workers "
+          f"({total / elapsed:.1f} matches/s)")
+
+    for games in results.values():
+        games.sort(key=lambda g: g["seed"])
+    rows = standings(entrants, results)
+    print_standings(rows)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"seeds": [seeds[0], seeds[-1]], "max_ticks": args.max_ticks, "level": args.level,
+                       "standings": rows, "games": results}, f, indent=1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+"""
+Many game2 worlds stepped together with NumPy, for training AI-track agents.
+
+VecEnv keeps N independent games in arrays and advances all of them in one
+step() call, with game2's rules: the spawn chances and speeds of the same level
+file (looked up per world in the level's tables), power-ups from stars, shields that absorb one bomb, slow time and
+game over on an unshielded bomb. Particles are left out (they only look nice).
+Each world has room for MAX_STARS stars and MAX_BOMBS bombs; a spawn that finds
+no free slot is skipped, which does not happen at normal spawn rates.
+
+    env = VecEnv(256, seed=1)
+    obs = env.reset()
+    for _ in range(100_000):
+        targets = chase_targets(obs)                # (N, 2) mouse positions
+        obs, rewards, dones, info = env.step(targets, actions)
+
+targets is where each world's "mouse" is, actions is a (N,) array of
+ACTION_SHIELD / ACTION_SLOW_TIME bits (or None). A reward is the score gained in
+that step; finished worlds start a new game straight away and their final score
+is in info["final_score"]. Nothing is drawn unless render() is called.
+
+The random numbers are drawn in a different order than Game does, so a world
+does not replay a Game with the same seed; the rules are the same.
+"""
+import argparse
+import os
+import time
+
+# No real display is needed - this must be set before pygame is imported
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import numpy as np
+import pygame
+
+from game import (FPS, PLAYER_SIZE, STAR_SIZE, BOMB_SIZE, ACTION_SHIELD, ACTION_SLOW_TIME, DEFAULT_LEVEL,
+                  COLOR_BG, COLOR_PLAYER, COLOR_SHIELD, COLOR_STAR_YELLOW, COLOR_BOMB)
+from common.levels import TICKS_PER_SECOND, load_level
+
+SIM_WIDTH, SIM_HEIGHT = 1920, 1080
+MAX_STARS = 64
+MAX_BOMBS = 32
+SHIELD_TICKS = FPS * 5
+SLOW_TIME_TICKS = FPS * 4
+
+
+def _round(values):
+    # pygame.Rect rounds float coordinates half away from zero
+    return np.copysign(np.floor(np.abs(values) + 0.5), values)
+
+
+class VecEnv:
+    def __init__(self, num_envs, width=SIM_WIDTH, height=SIM_HEIGHT, seed=None, level=DEFAULT_LEVEL):
+        self.num_envs = num_envs
+        self.width = width
+        self.height = height
+        self.rng = np.random.default_rng(seed)
+        self.level = load_level(level)
+        self.spawn_table = np.array(self.level.rows)  # (score bands, 7), columns as in Level.at()
+        self.wave_table = np.array([wave or (1.0, 1.0) for wave in self.level.waves]).reshape(-1, 2)
+        n = num_envs
+        self.player = np.zeros((n, 2), dtype=np.int64)  # top-left corner
+        self.stars_x = np.zeros((n, MAX_STARS), dtype=np.int64)
+        self.stars_y = np.zeros((n, MAX_STARS), dtype=np.int64)
+        self.stars_speed = np.zeros((n, MAX_STARS))
+        self.stars_alive = np.zeros((n, MAX_STARS), dtype=bool)
+        self.bombs_x = np.zeros((n, MAX_BOMBS), dtype=np.int64)
+        self.bombs_y = np.zeros((n, MAX_BOMBS), dtype=np.int64)
+        self.bombs_speed = np.zeros((n, MAX_BOMBS))
+        self.bombs_alive = np.zeros((n, MAX_BOMBS), dtype=bool)
+        self.score = np.zeros(n, dtype=np.int64)
+        self.missed = np.zeros(n, dtype=np.int64)
+        self.shield_count = np.zeros(n, dtype=np.int64)
+        self.shield_timer = np.zeros(n, dtype=np.int64)  # > 0 while the shield is up
+        self.slow_time_count = np.zeros(n, dtype=np.int64)
+        self.slow_time_timer = np.zeros(n, dtype=np.int64)  # > 0 while time is slowed
+        self.ticks = np.zeros(n, dtype=np.int64)
+        self.reset()
+
+    # Starts new games in the worlds picked by mask (all of them by default)
+    def reset(self, mask=None):
+        if mask is None:
+            mask = np.ones(self.num_envs, dtype=bool)
+        self.player[mask] = (self.width // 2, self.height - 150)
+        for array in (self.stars_alive, self.bombs_alive, self.score, self.missed, self.shield_count,
+                      self.shield_timer, self.slow_time_count, self.slow_time_timer, self.ticks):
+            array[mask] = 0
+        return self.observe()
+
+    def observe(self):
+        return {
+            "player": self.player.copy(),
+            "stars_x": self.stars_x.copy(), "stars_y": self.stars_y.copy(),
+            "stars_speed": self.stars_speed.copy(), "stars_alive": self.stars_alive.copy(),
+            "bombs_x": self.bombs_x.copy(), "bombs_y": self.bombs_y.copy(),
+            "bombs_speed": self.bombs_speed.copy(), "bombs_alive": self.bombs_alive.copy(),
+            "shield_count": self.shield_count.copy(), "shield_active": self.shield_timer > 0,
+            "slow_time_count": self.slow_time_count.copy(), "slow_time_active": self.slow_time_timer > 0,
+            "score": self.score.copy(),
+        }
+
+    def _spawn(self, chance, alive, xs, ys, speeds, size, speed_low, speed_high):
+        rows = np.arange(self.num_envs)
+        slot = np.argmin(alive, axis=1)  # first free slot
+        spawn = (self.rng.random(self.num_envs) < chance) & ~alive[rows, slot]
+        rows, slot = rows[spawn], slot[spawn]
+        count = len(rows)
+        xs[rows, slot] = self.rng.integers(0, self.width - size + 1, count)
+        ys[rows, slot] = -size
+        low, high = speed_low[spawn], speed_high[spawn]
+        speeds[rows, slot] = low + (high - low) * self.rng.random(count)
+        alive[rows, slot] = True
+        return spawn
+
+    def _move(self, ys, speeds, alive, slow):
+        factor = np.where(slow, 0.5, 1.0)[:, None]
+        np.copyto(ys, _round(ys + speeds * factor).astype(np.int64), where=alive)
+
+    def _hits(self, xs, ys, alive, size):
+        px = self.player[:, 0:1]
+        py = self.player[:, 1:2]
+        return (alive & (xs < px + PLAYER_SIZE) & (xs + size > px)
+                & (ys < py + PLAYER_SIZE) & (ys + size > py))
+
+    # Level.at() for every world: (num_envs, 7)
+    def _spawn_rows(self):
+        level = self.level
+        rows = self.spawn_table[np.minimum(self.score // level.score_band, level.last_band)]
+        if len(self.wave_table):
+            seconds = self.ticks // TICKS_PER_SECOND
+            in_wave = seconds < len(self.wave_table)
+            scale = self.wave_table[np.where(in_wave, seconds, 0)]
+            rows[in_wave, 0] *= scale[in_wave, 0]
+            rows[in_wave, 3] *= scale[in_wave, 1]
+        return rows
+
+    def step(self, targets, actions=None):
+        rng = self.rng
+        shield_on = self.shield_timer > 0
+        slow_on = self.slow_time_timer > 0
+
+        # Power-ups pressed since the last step
+        if actions is not None:
+            actions = np.asarray(actions)
+            start = (actions & ACTION_SHIELD).astype(bool) & (self.shield_count > 0) & ~shield_on
+            self.shield_timer[start] = SHIELD_TICKS
+            self.shield_count -= start
+            start = (actions & ACTION_SLOW_TIME).astype(bool) & (self.slow_time_count > 0) & ~slow_on
+            self.slow_time_timer[start] = SLOW_TIME_TICKS
+            self.slow_time_count -= start
+            shield_on = self.shield_timer > 0
+            slow_on = self.slow_time_timer > 0
+
+        # Spawning (Game.spawn_objects)
+        self.ticks += 1
+        rows = self._spawn_rows()
+        spawned = self._spawn(rows[:, 0], self.stars_alive, self.stars_x, self.stars_y, self.stars_speed, STAR_SIZE,
+                              rows[:, 1], rows[:, 2])
+        power_up = spawned & (rng.random(self.num_envs) < rows[:, 6])
+        shield_up = rng.random(self.num_envs) < 0.5
+        self.shield_count += power_up & shield_up
+        self.slow_time_count += power_up & ~shield_up
+        self._spawn(rows[:, 3], self.bombs_alive, self.bombs_x, self.bombs_y, self.bombs_speed, BOMB_SIZE,
+                    rows[:, 4], rows[:, 5])
+
+        # Player follows the target, kept on screen (Player.update)
+        targets = np.asarray(targets, dtype=np.int64)
+        self.player[:, 0] = np.clip(targets[:, 0] - PLAYER_SIZE // 2, 0, self.width - PLAYER_SIZE)
+        self.player[:, 1] = np.clip(targets[:, 1] - PLAYER_SIZE // 2, 0, self.height - PLAYER_SIZE)
+        self.shield_timer[shield_on] -= 1
+        shield_on = self.shield_timer > 0
+
+        # Stars: caught ones score, the rest that fall off the bottom are missed
+        self._move(self.stars_y, self.stars_speed, self.stars_alive, slow_on)
+        caught = self._hits(self.stars_x, self.stars_y, self.stars_alive, STAR_SIZE)
+        fell = self.stars_alive & ~caught & (self.stars_y > self.height)
+        rewards = caught.sum(axis=1) * 10
+        self.score += rewards
+        self.missed += fell.sum(axis=1)
+        self.stars_alive &= ~(caught | fell)
+
+        # Bombs: a shield absorbs the first hit, any other hit ends the game
+        self._move(self.bombs_y, self.bombs_speed, self.bombs_alive, slow_on)
+        hit = self._hits(self.bombs_x, self.bombs_y, self.bombs_alive, BOMB_SIZE)
+        hits = hit.sum(axis=1)
+        dones = hits > shield_on
+        self.shield_timer[shield_on & (hits > 0)] = 0
+        self.bombs_alive &= ~(hit | (self.bombs_y > self.height))
+
+        self.slow_time_timer[slow_on] -= 1
+
+        final_score = np.where(dones, self.score, 0)
+        if dones.any():
+            self.reset(dones)
+        return self.observe(), rewards, dones, {"final_score": final_score}
+
+    # Draws world `index` onto surf (a new Surface if none is given) and returns it
+    def render(self, index=0, surf=None):
+        if surf is None:
+            surf = pygame.Surface((self.width, self.height))
+        surf.fill(COLOR_BG)
+        for x, y in zip(self.stars_x[index][self.stars_alive[index]], self.stars_y[index][self.stars_alive[index]]):
+            pygame.draw.rect(surf, COLOR_STAR_YELLOW, (int(x), int(y), STAR_SIZE, STAR_SIZE), border_radius=6)
+        for x, y in zip(self.bombs_x[index][self.bombs_alive[index]], self.bombs_y[index][self.bombs_alive[index]]):
+            radius = BOMB_SIZE // 2
+            pygame.draw.circle(surf, COLOR_BOMB, (int(x) + radius, int(y) + radius), radius)
+        color = COLOR_SHIELD if self.shield_timer[index] > 0 else COLOR_PLAYER
+        pygame.draw.rect(surf, color, (*self.player[index].tolist(), PLAYER_SIZE, PLAYER_SIZE), border_radius=10)
+        return surf
+
+
+# Baseline policy: move under the lowest star in every world
+def chase_targets(obs):
+    player_center = obs["player"] + PLAYER_SIZE // 2
+    lowest = np.argmax(np.where(obs["stars_alive"], obs["stars_y"], np.iinfo(np.int64).min), axis=1)
+    rows = np.arange(len(lowest))
+    has_star = obs["stars_alive"].any(axis=1)
+    target_x = np.where(has_star, obs["stars_x"][rows, lowest] + STAR_SIZE // 2, player_center[:, 0])
+    return np.stack([target_x, player_center[:, 1]], axis=1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Step many game2 worlds at once with the chase policy")
+    parser.add_argument("--envs", type=int, default=1024)
+    parser.add_argument("--steps", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--level", default=DEFAULT_LEVEL, help="level file or name (default: %(default)s)")
+    args = parser.parse_args()
+
+    env = VecEnv(args.envs, seed=args.seed, level=args.level)
+    obs = env.reset()
+    finished = []
+    start = time.perf_counter()
+    for _ in range(args.steps):
+        obs, rewards, dones, info = env.step(chase_targets(obs))
+        finished.extend(info["final_score"][dones].tolist())
+    elapsed = time.perf_counter() - start
+
+    total = args.envs * args.steps
+    print(f"{total} steps in {elapsed:.2f}s ({total / elapsed:.0f} steps/s)")
+    if finished:
+        print(f"{len(finished)} games finished, average score {sum(finished) / len(finished):.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,10 @@
+import os
+import sys
+
+# No real display or sound is needed - this must be set before pygame is imported
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+PROJECTS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, PROJECTS)
+sys.path.insert(0, os.path.join(PROJECTS, "game2"))  # game2's modules import each other by name
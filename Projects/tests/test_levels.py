@@ -0,0 +1,73 @@
+import glob
+import json
+import math
+import os
+
+import pytest
+
+from common import levels
+from common.levels import LevelError, compile_level, load_level
+
+
+@pytest.mark.parametrize("path", sorted(glob.glob(os.path.join(levels.LEVELS_DIR, "*.json"))))
+def test_shipped_levels_compile(path):
+    with open(path) as f:
+        level = compile_level(json.load(f))
+    for row in level.rows:
+        assert 0 <= row[0] <= 1 and 0 <= row[3] <= 1 and 0 <= row[6] <= 1
+        assert 0 < row[1] <= row[2] and 0 < row[4] <= row[5]
+
+
+def test_ramps_and_waves():
+    level = compile_level({
+        "score_band": 10,
+        "star": {"chance": [0.1, 100, 0.2], "speed": 4, "speed_spread": 2},
+        "bomb": {"chance": 0.05, "speed": [2, 50, 3], "speed_high": 8},
+        "power_up": 0.5,
+        "waves": [{"from": 2, "to": 3, "star": 2.0, "bomb": 0.0}],
+    })
+    assert level.at(0) == (0.1, 4, 6, 0.05, 2, 8, 0.5)
+    star_chance, _, _, _, bomb_low, _, _ = level.at(15)
+    assert star_chance == pytest.approx(0.1 + 10 / 100)  # the band of 10 to 19 points
+    assert bomb_low == pytest.approx(2 + 10 / 50)
+    assert level.at(10_000)[0] == pytest.approx(0.1 + 0.2)
+    assert level.at(10_000) == level.at(1_000_000)  # every ramp is at its cap
+    assert level.at(0, 2 * levels.TICKS_PER_SECOND)[::3] == (0.2, 0.0, 0.5)
+    assert level.at(0, 3 * levels.TICKS_PER_SECOND) == level.at(0)
+
+
+def test_compiled_levels_are_cached(tmp_path, monkeypatch):
+    monkeypatch.setattr(levels, "CACHE_DIR", str(tmp_path))
+    path = tmp_path / "test.json"
+    path.write_text(json.dumps({"name": "Test", "star": {"chance": [0.03, 1500, 0.06], "speed": 3},
+                                "waves": [{"from": 1, "to": 2.5, "star": 3}]}))
+    compiled = levels._load(str(path))
+    assert len(os.listdir(tmp_path / "levels")) == 1
+    cached = levels._load(str(path))
+    assert (cached.name, cached.score_band, cached.rows, cached.waves) == \
+        (compiled.name, compiled.score_band, compiled.rows, compiled.waves)
+    assert load_level(str(path)) is load_level(str(path))
+
+
+@pytest.mark.parametrize("data", [
+    [],
+    {"score_band": 0},
+    {"star": {"chance": math.nan}},
+    {"star": {"chance": 1.5}},
+    {"star": {"chance": [0.5, 100, 0.8]}},  # reaches 1.3
+    {"star": {"chance": True}},
+    {"star": {"chance": [0.1, 0, 0.1]}},
+    {"star": {"speed": 0}},
+    {"star": {"speed": [5, 10, math.inf]}},
+    {"bomb": {"speed": [-1, 10, 2]}},
+    {"bomb": {"speed_high": -3}},
+    {"bomb": {"speed_spread": -1}},
+    {"power_up": -0.1},
+    {"star": {"chance": [0.1, 1, 100_000_000]}},  # too many score bands
+    {"waves": [{"from": 5, "to": 5}]},
+    {"waves": [{"from": 0, "to": math.inf}]},
+    {"waves": [{"from": 0, "to": 5, "star": "2"}]},
+])
+def test_invalid_levels_are_rejected(data):
+    with pytest.raises(LevelError):
+        compile_level(data)
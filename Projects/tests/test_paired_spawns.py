@@ -0,0 +1,34 @@
+import random
+
+from game import SPAWN_DRAWS
+from headless import make_game, chase_policy, idle_policy
+
+
+def spawned(game):
+    return sorted((obj.rect.x, obj.rect.y) for obj in game.stars) + sorted((obj.rect.x, obj.rect.y) for obj in game.bombs)
+
+
+def test_spawns_do_not_depend_on_how_the_game_is_played():
+    random.seed(1)
+    chase = make_game(chase_policy, spawn_rng=random.Random(7))
+    random.seed(2)
+    idle = make_game(idle_policy, spawn_rng=random.Random(7))
+    # Nothing reaches the player in the first second, so both games hold the same objects
+    for _ in range(60):
+        chase.update()
+        idle.update()
+    assert spawned(chase)
+    assert spawned(chase) == spawned(idle)
+
+
+def test_every_tick_takes_the_same_number_of_values():
+    for policy in (chase_policy, idle_policy):
+        game = make_game(policy, spawn_rng=random.Random(7))
+        ticks = 0
+        while not game.game_over and ticks < 2000:
+            game.update()
+            ticks += 1
+        expected = random.Random(7)
+        for _ in range(ticks * SPAWN_DRAWS):
+            expected.random()
+        assert game.spawn_rng.getstate() == expected.getstate()
@@ -0,0 +1,46 @@
+import random
+
+import game as G
+import replay
+from common.levels import load_level
+from common.replay import Recording, TickInput
+from headless import chase_policy
+
+
+def record(path, seed, ticks):
+    random.seed(seed)
+    tick_input = TickInput()
+    game = G.Game(1280, 720, input_source=tick_input, level=load_level("game2"), rewind=True)
+    recording = Recording(seed, {"game": "game2", "width": 1280, "height": 720, "level": "game2", "rewind": True})
+    for tick in range(ticks):
+        pos = chase_policy(game)
+        actions = 0
+        if tick % 700 == 350:
+            actions |= G.ACTION_SHIELD
+        if tick % 900 == 450:
+            actions |= G.ACTION_SLOW_TIME
+        if tick % 1000 == 999:
+            actions |= G.ACTION_REWIND
+        if game.game_over and tick % 50 == 0:
+            actions |= G.ACTION_RESTART
+        tick_input.pos = pos
+        recording.add(pos, actions)
+        game.apply_actions(actions)
+        if not game.paused:
+            game.update()
+    recording.info.update(score=game.score, missed=game.missed)
+    recording.save(path)
+    return game
+
+
+def test_replay_matches_the_recorded_session(tmp_path):
+    path = str(tmp_path / "session.rec")
+    recorded = record(path, 1234, 4000)
+    assert recorded.score > 0
+
+    recording = Recording.load(path)
+    assert len(recording) == 4000
+    game, ticks = replay.replay_fast(recording, None)
+    assert ticks == 4000
+    assert (game.score, game.missed, game.spawn_timer) == (recorded.score, recorded.missed, recorded.spawn_timer)
+    assert game.snapshot() == recorded.snapshot()
@@ -0,0 +1,49 @@
+import random
+
+from common.rewind import SnapshotWriter, load_snapshot
+from headless import make_game, chase_policy
+
+
+def state(game):
+    return (game.score, game.missed, game.game_over, game.spawn_timer, len(game.stars), len(game.bombs),
+            len(game.particles), game.player.rect.topleft)
+
+
+def play(game, ticks):
+    for _ in range(ticks):
+        game.update()
+
+
+def test_restore_continues_the_same_game():
+    random.seed(5)
+    game = make_game(chase_policy)
+    play(game, 1500)
+    data = game.snapshot()
+    play(game, 1000)
+    expected = state(game)
+
+    game.restore(data)
+    play(game, 1000)
+    assert state(game) == expected
+
+    # A new game picks it up too, whatever its own random state was
+    random.seed(99)
+    other = make_game(chase_policy)
+    other.restore(data)
+    play(other, 1000)
+    assert state(other) == expected
+
+
+def test_snapshot_writer(tmp_path):
+    path = str(tmp_path / "resume.snap")
+    writer = SnapshotWriter(path)
+    writer.save(b"first")
+    writer.save(b"second")
+    writer.close()
+    assert load_snapshot(path) == b"second"
+
+    writer = SnapshotWriter(path)
+    writer.save(b"third")
+    writer.remove()
+    writer.close()
+    assert load_snapshot(path) is None
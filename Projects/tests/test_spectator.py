@@ -0,0 +1,94 @@
+import random
+import socket
+import time
+
+import numpy as np
+import pytest
+
+from headless import make_game, chase_policy
+from spectator import (DELTA, KEYFRAME, MESSAGE, SpectatorClient, SpectatorServer, decode, encode, snapshot,
+                       unpack)
+
+
+def roundtrip(kind, tick, state, previous=None, decoded_previous=None):
+    message = encode(kind, tick, state, previous)
+    length, kind, tick = MESSAGE.unpack_from(message)
+    assert len(message) == MESSAGE.size + length
+    return decode(kind, tick, message[MESSAGE.size:], decoded_previous)
+
+
+def test_keyframes_and_deltas_rebuild_every_tick():
+    random.seed(3)
+    game = make_game(chase_policy)
+    previous = decoded = None
+    for tick in range(1, 600):
+        game.update()
+        state = snapshot(game)
+        kind = KEYFRAME if previous is None else DELTA
+        decoded_tick, decoded = roundtrip(kind, tick, state, previous, decoded)
+        assert decoded_tick == tick
+        assert np.array_equal(decoded, state)
+        previous = state
+
+
+def test_deltas_handle_resizing_and_wraparound():
+    before = np.array([5, -2 ** 31, 2 ** 31 - 1, 7], dtype=np.int32)
+    for after in (np.array([-5, 2 ** 31 - 1, -2 ** 31], dtype=np.int32),
+                  np.array([1, 2, 3, 4, 5, 6], dtype=np.int32)):
+        _, decoded = roundtrip(DELTA, 2, after, before, before)
+        assert np.array_equal(decoded, after)
+
+
+def test_delta_without_keyframe():
+    state = np.arange(4, dtype=np.int32)
+    with pytest.raises(ValueError):
+        roundtrip(DELTA, 1, state, state)
+
+
+def test_unpack():
+    random.seed(3)
+    game = make_game(chase_policy)
+    for _ in range(300):
+        game.update()
+    fields = unpack(snapshot(game))
+    assert (fields["score"], fields["missed"], fields["player_x"]) == (game.score, game.missed, game.player.rect.x)
+    assert [star[:2] for star in fields["star_list"]] == [[s.rect.x, s.rect.y] for s in game.stars.active]
+    assert fields["bomb_list"] == [[b.rect.x, b.rect.y] for b in game.bombs.active]
+
+
+def wait_for(condition, timeout=2.0):
+    end = time.monotonic() + timeout
+    while not condition() and time.monotonic() < end:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_server_streams_to_clients():
+    random.seed(3)
+    game = make_game(chase_policy)
+    server = SpectatorServer("127.0.0.1", 0)
+    server.start()
+    try:
+        client = SpectatorClient("127.0.0.1", server.port)
+        assert wait_for(lambda: len(server.spectators) == 1)
+        for _ in range(200):
+            game.update()
+            server.publish(game)
+            client.poll()
+        expected = snapshot(game)
+
+        def caught_up():
+            client.poll()
+            return np.array_equal(client.state, expected)
+        assert wait_for(caught_up)
+
+        # Whatever a spectator sends is dropped; closing its side removes it
+        peer = socket.create_connection(("127.0.0.1", server.port))
+        assert wait_for(lambda: len(server.spectators) == 2)
+        peer.sendall(b"x" * 1_000_000)
+        peer.shutdown(socket.SHUT_WR)
+        assert wait_for(lambda: len(server.spectators) == 1)
+        peer.close()
+        client.close()
+    finally:
+        server.close()